@@ -0,0 +1,65 @@
+# ============================================================
+# SPDX-License-Identifier: GPL-3.0-or-later
+# This program was generated as part of the AgentFoundry project.
+# Copyright (C) 2025  John Brosnihan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ============================================================
+"""Production entry point: ``python -m planner_service``.
+
+Runs uvicorn with loop/http "auto" (uvloop/httptools when installed),
+``WEB_CONCURRENCY`` worker processes (one by default), and access logging
+disabled. uvloop and httptools come from ``uvicorn[standard]``; where they
+are unavailable (uvloop does not support Windows) uvicorn falls back to
+asyncio and h11.
+"""
+
+import os
+
+import uvicorn
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a positive integer from the environment with a safe default.
+
+    Unset, non-numeric and non-positive values fall back to ``default``
+    so a bad deployment setting never crashes startup.
+    """
+    try:
+        value = int(os.environ.get(name, ""))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def main() -> None:
+    """Start the planner service under uvicorn."""
+    # One worker unless the deployment opts in: os.cpu_count() reports
+    # host CPUs, not the container's cgroup quota.
+    workers = _env_int("WEB_CONCURRENCY", 1)
+    uvicorn.run(
+        "planner_service.api:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=_env_int("PORT", 8080),
+        # "auto" selects uvloop/httptools when installed, else the stdlib
+        loop="auto",
+        http="auto",
+        workers=workers,
+        access_log=False,
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
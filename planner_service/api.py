@@ -18,19 +18,28 @@
 # ============================================================
 """FastAPI application for the planner service (AF v1.1)."""
 
+import hmac
 import os
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Annotated, Any, AsyncGenerator, Callable
 from uuid import UUID, uuid4
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
 
 from planner_service import __version__
 from planner_service.auth import AuthContext, get_current_user
 from planner_service.context_driver import get_context_driver
-from planner_service.logging import configure_logging, get_logger
+from planner_service.logging import (
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
 from planner_service.models import (
     ErrorDetail,
     ErrorResponse,
@@ -44,15 +53,22 @@ from planner_service.models import (
 from planner_service.plan_validator import PlanValidationFailure, get_plan_validator
 from planner_service.prompt_engine import get_prompt_engine
 
+logger = get_logger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan handler for startup/shutdown events."""
     configure_logging()
-    logger = get_logger(__name__)
+    # Resolve collaborators once so driver/engine set-up cost is paid at boot
+    # rather than on the first request.
+    app.state.context_driver = get_context_driver()
+    app.state.prompt_engine = get_prompt_engine()
+    app.state.plan_validator = get_plan_validator()
     logger.info("planner_service_starting", version=__version__)
     yield
     logger.info("planner_service_shutting_down")
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -62,100 +78,178 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Plan payloads are large, repetitive JSON; level 1 removes most of the bytes
+# for little CPU. Small bodies such as health checks are sent uncompressed.
+GZIP_MINIMUM_SIZE = 1024
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=1)
+
+
+def _error_response(
+    status_code: int, code: str, message: str, request_id: UUID
+) -> Response:
+    """Build a structured error response.
+
+    Args:
+        status_code: HTTP status code for the response.
+        code: Machine-readable error code.
+        message: Human-readable error message.
+        request_id: Request ID to echo in the response (no run_id on errors).
+
+    Returns:
+        Response carrying the ErrorResponse serialized in a single
+        pydantic-core pass.
+    """
+    # Every caller passes str/UUID values it produced itself, so skip
+    # validation and assemble the models directly.
+    error_response = ErrorResponse.model_construct(
+        error=ErrorDetail.model_construct(code=code, message=message),
+        request_id=request_id,
+    )
+    return Response(
+        content=error_response.model_dump_json(exclude_none=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def _collaborator(request: Request, name: str, factory: Callable[[], Any]) -> Any:
+    """Return the collaborator stored on ``app.state`` at startup.
+
+    Without the lifespan (e.g. a TestClient used outside a ``with`` block)
+    the attribute is absent and the memoized factory is used instead. The
+    check is against ``None`` rather than truthiness, so a collaborator that
+    happens to be falsy is never silently replaced.
+
+    Args:
+        request: The raw request, used to reach app-scoped state.
+        name: Attribute name on ``app.state``.
+        factory: Memoized factory returning the default collaborator.
+
+    Returns:
+        The configured collaborator, or the factory's default.
+    """
+    collaborator = getattr(request.app.state, name, None)
+    if collaborator is None:
+        collaborator = factory()
+    return collaborator
+
+
+def _model_response(model: BaseModel) -> Response:
+    """Serialize a response model that was built from trusted server data.
+
+    Routes return this instead of the model itself so FastAPI does not
+    re-validate and re-encode it against a declared response_model.
+
+    Args:
+        model: The response model to serialize.
+
+    Returns:
+        Response carrying the model serialized by pydantic-core.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(
     request: Request, exc: HTTPException
-) -> JSONResponse:
+) -> Response:
     """Handle HTTP exceptions with structured error response."""
     # Generate a request_id for error tracking
     error_request_id = uuid4()
-    error_response = ErrorResponse(
-        error=ErrorDetail(
-            code=f"HTTP_{exc.status_code}",
-            message=str(exc.detail),
-        ),
-        request_id=error_request_id,
-    )
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=error_response.model_dump(mode="json", exclude_none=True),
+    return _error_response(
+        exc.status_code,
+        f"HTTP_{exc.status_code}",
+        str(exc.detail),
+        error_request_id,
     )
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
-) -> JSONResponse:
+) -> Response:
     """Handle validation errors with structured error response including request_id.
 
     This ensures that validation failures (422 errors) include a request_id
     per the acceptance criteria that all error responses include request_id.
     """
-    # Try to extract client-provided request_id from the request body
+    # Try to extract client-provided request_id from the body FastAPI already
+    # decoded while validating, rather than reading and parsing it again
     error_request_id = uuid4()
-    try:
-        body = await request.json()
-        if isinstance(body, dict) and "request_id" in body:
+    body = getattr(exc, "body", None)
+    if isinstance(body, dict) and "request_id" in body:
+        try:
             error_request_id = UUID(body["request_id"])
-    except Exception:
-        # If we can't parse the body or request_id, use generated one
-        pass
-
-    # Build a summary message from validation errors
-    error_messages = []
-    for error in exc.errors():
-        loc = ".".join(str(part) for part in error["loc"])
-        error_messages.append(f"{loc}: {error['msg']}")
-
-    error_response = ErrorResponse(
-        error=ErrorDetail(
-            code="VALIDATION_ERROR",
-            message="; ".join(error_messages) if error_messages else "Validation failed",
-        ),
-        request_id=error_request_id,
+        except (AttributeError, TypeError, ValueError):
+            # If the request_id is malformed, use the generated one
+            pass
+
+    # Build a summary message from validation errors in a single join
+    message = "; ".join(
+        f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+        for error in exc.errors()
     )
-    return JSONResponse(
-        status_code=422,
-        content=error_response.model_dump(mode="json", exclude_none=True),
+
+    return _error_response(
+        422,
+        "VALIDATION_ERROR",
+        message or "Validation failed",
+        error_request_id,
     )
 
 
-@app.get("/health", response_model=HealthResponse, tags=["health"])
-async def health_check() -> HealthResponse:
+# The health payload is constant for the life of the process, so it is
+# serialized once at import and served as raw bytes.
+_HEALTH_BODY = HealthResponse(
+    status="healthy",
+    service="planner-service",
+    version=__version__,
+).model_dump_json().encode()
+
+
+@app.get(
+    "/health",
+    response_model=None,
+    responses={200: {"model": HealthResponse}},
+    tags=["health"],
+)
+async def health_check() -> Response:
     """Health check endpoint for Cloud Run.
 
     Returns service health status. Always returns healthy status
     to ensure the endpoint is available even when downstream
     services are unavailable.
     """
-    return HealthResponse(
-        status="healthy",
-        service="planner-service",
-        version=__version__,
-    )
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-@app.get("/healthz", response_model=HealthResponse, tags=["health"])
-async def healthz() -> HealthResponse:
+@app.get(
+    "/healthz",
+    response_model=None,
+    responses={200: {"model": HealthResponse}},
+    tags=["health"],
+)
+async def healthz() -> Response:
     """Kubernetes-style health check endpoint.
 
     Returns service health status. Always returns healthy status
     to ensure the endpoint is available even when downstream
     services are unavailable.
     """
-    return HealthResponse(
-        status="healthy",
-        service="planner-service",
-        version=__version__,
-    )
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-@app.post("/v1/plan", response_model=PlanResponse, tags=["planning"])
+@app.post(
+    "/v1/plan",
+    response_model=None,
+    responses={200: {"model": PlanResponse}},
+    tags=["planning"],
+)
 async def create_plan(
     request: PlanRequest,
-    auth: AuthContext = Depends(get_current_user),
-) -> PlanResponse | JSONResponse:
+    auth: Annotated[AuthContext, Depends(get_current_user)],
+    http_request: Request,
+) -> Response:
     """Create a new planning request.
 
     This endpoint accepts a planning request, fetches repository context,
@@ -164,152 +258,106 @@ async def create_plan(
     Args:
         request: The plan request containing repository and user input.
         auth: The authentication context from the current user.
+        http_request: The raw request, used to reach app-scoped collaborators.
 
     Returns:
-        A PlanResponse with request_id, run_id, and status on success.
-        JSONResponse with structured error (including request_id only) on failure.
+        A serialized PlanResponse with request_id, run_id, and status on success.
+        JSON Response with structured error (including request_id only) on failure.
     """
-    logger = get_logger(__name__)
-
     # Use provided request_id or generate a new one
     request_id = request.request_id or uuid4()
-    repo_str = f"{request.repository.owner}/{request.repository.name}"
+    request_id_str = str(request_id)
 
-    logger.info(
-        "plan_request_received",
-        request_id=str(request_id),
-        repository=repo_str,
+    # Bind the per-request fields once; every subsequent event reuses them
+    log = logger.bind(
+        request_id=request_id_str,
+        repository=request.repository.full_name,
         repo_owner=request.repository.owner,
         repo_name=request.repository.name,
         repo_ref=request.repository.ref,
         user_id=auth.user_id,
-        outcome="pending",
     )
+    log.info("plan_request_received", outcome="pending")
 
-    # Step 1: Fetch context using context driver
+    driver = _collaborator(http_request, "context_driver", get_context_driver)
+    engine = _collaborator(http_request, "prompt_engine", get_prompt_engine)
+    validator = _collaborator(http_request, "plan_validator", get_plan_validator)
+
+    # Step 1: Fetch context using context driver. Drivers expose a blocking
+    # interface (fixture reads, GitHub calls), so run them off the event loop.
     try:
-        driver = get_context_driver()
-        project_context = driver.fetch_context(request.repository)
-    except FileNotFoundError as e:
-        logger.error(
-            "plan_request_context_failure",
-            request_id=str(request_id),
-            repository=repo_str,
-            repo_owner=request.repository.owner,
-            repo_name=request.repository.name,
-            repo_ref=request.repository.ref,
-            user_id=auth.user_id,
-            error=str(e),
-            outcome="failure",
-        )
-        error_response = ErrorResponse(
-            error=ErrorDetail(
-                code="CONTEXT_DRIVER_ERROR",
-                message=f"Failed to fetch repository context: {e}",
-            ),
-            request_id=request_id,
-        )
-        return JSONResponse(
-            status_code=500,
-            content=error_response.model_dump(mode="json", exclude_none=True),
+        project_context = await run_in_threadpool(
+            driver.fetch_context, request.repository
         )
     except Exception as e:
-        logger.error(
+        log.error(
             "plan_request_context_failure",
-            request_id=str(request_id),
-            repository=repo_str,
-            repo_owner=request.repository.owner,
-            repo_name=request.repository.name,
-            repo_ref=request.repository.ref,
-            user_id=auth.user_id,
             error=str(e),
             outcome="failure",
         )
-        error_response = ErrorResponse(
-            error=ErrorDetail(
-                code="CONTEXT_DRIVER_ERROR",
-                message=f"Unexpected error fetching context: {e}",
-            ),
-            request_id=request_id,
+        prefix = (
+            "Failed to fetch repository context"
+            if isinstance(e, FileNotFoundError)
+            else "Unexpected error fetching context"
         )
-        return JSONResponse(
-            status_code=500,
-            content=error_response.model_dump(mode="json", exclude_none=True),
+        return _error_response(
+            500,
+            "CONTEXT_DRIVER_ERROR",
+            f"{prefix}: {e}",
+            request_id,
         )
 
     # Step 2: Build PlanningContext (AF v1.1)
-    planning_context = PlanningContext(
+    # Every part is already validated (request body, driver output) or
+    # server-generated, so assemble it without a second validation pass.
+    planning_context = PlanningContext.model_construct(
         request_id=request_id,
         user_input=request.user_input,
         projects=[project_context],
     )
 
-    # Step 3: Invoke prompt engine
+    # Step 3: Invoke prompt engine (blocking LLM call, run off the event loop)
     try:
-        prompt_engine = get_prompt_engine()
-        engine_result = prompt_engine.run(planning_context)
+        engine_result = await run_in_threadpool(engine.run, planning_context)
     except Exception as e:
-        logger.error(
+        log.error(
             "plan_request_engine_failure",
-            request_id=str(request_id),
-            repository=repo_str,
-            repo_owner=request.repository.owner,
-            repo_name=request.repository.name,
-            repo_ref=request.repository.ref,
-            user_id=auth.user_id,
             error=str(e),
             outcome="failure",
         )
-        error_response = ErrorResponse(
-            error=ErrorDetail(
-                code="PROMPT_ENGINE_ERROR",
-                message=f"Plan generation failed: {e}",
-            ),
-            request_id=request_id,
-        )
-        return JSONResponse(
-            status_code=500,
-            content=error_response.model_dump(mode="json", exclude_none=True),
+        return _error_response(
+            500,
+            "PROMPT_ENGINE_ERROR",
+            f"Plan generation failed: {e}",
+            request_id,
         )
 
     # Step 4: Validate prompt engine output
     try:
-        validator = get_plan_validator()
         validated_payload = validator.validate(planning_context, engine_result)
     except PlanValidationFailure as e:
         # Log structured validation failure event per AF v1.1 contract
         logger.warning(
             "plan.validation.failed",
-            request_id=str(request_id),
+            request_id=request_id_str,
             validator_name=type(validator).__name__,
             error_code=e.code,
         )
-        logger.error(
+        log.error(
             "plan_request_validation_failure",
-            request_id=str(request_id),
-            repository=repo_str,
-            repo_owner=request.repository.owner,
-            repo_name=request.repository.name,
-            repo_ref=request.repository.ref,
-            user_id=auth.user_id,
             error_code=e.code,
             error=e.message,
             outcome="failure",
         )
-        error_response = ErrorResponse(
-            error=ErrorDetail(
-                code=e.code,
-                message=e.message,
-            ),
-            request_id=request_id,
-        )
-        return JSONResponse(
-            status_code=422,
-            content=error_response.model_dump(mode="json", exclude_none=True),
+        return _error_response(
+            422,
+            e.code,
+            e.message,
+            request_id,
         )
 
     # Step 5: Generate run_id (mirrors request_id for synchronous flow)
-    run_id = request_id
+    run_id = request_id_str
 
     # Determine status from engine result - use "ok" for success per AF v1.1
     engine_status = validated_payload.get("status", "pending")
@@ -318,33 +366,36 @@ async def create_plan(
     # Determine outcome based on the computed status
     outcome = "success" if status == "ok" else "failure"
 
-    logger.info(
+    log.info(
         "plan_request_completed",
-        request_id=str(request_id),
-        run_id=str(run_id),
-        repository=repo_str,
-        repo_owner=request.repository.owner,
-        repo_name=request.repository.name,
-        repo_ref=request.repository.ref,
-        user_id=auth.user_id,
+        run_id=run_id,
         outcome=outcome,
         status=status,
     )
 
-    return PlanResponse(
-        request_id=request_id,
-        run_id=run_id,
-        status=status,
-        payload=validated_payload if status == "ok" else None,
+    # Every field is server-produced and the payload has already been
+    # validated, so encode the PlanResponse shape directly instead of
+    # building the model only to serialize it again.
+    body = to_json(
+        {
+            "request_id": request_id_str,
+            "run_id": run_id,
+            "status": status,
+            "payload": validated_payload if status == "ok" else None,
+        }
     )
+    return Response(content=body, media_type="application/json")
 
 
 # Stub authorization token for debug endpoint
 DEBUG_AUTH_TOKEN = os.environ.get("DEBUG_AUTH_TOKEN", "debug-token-stub")
+_DEBUG_AUTH_TOKEN_BYTES = DEBUG_AUTH_TOKEN.encode()
 
 
-def _verify_debug_auth(authorization: str | None) -> None:
-    """Verify authorization for debug endpoints.
+def verify_debug_auth(
+    authorization: Annotated[str | None, Header()] = None,
+) -> None:
+    """Dependency verifying authorization for debug endpoints.
 
     Args:
         authorization: The Authorization header value.
@@ -355,62 +406,65 @@ def _verify_debug_auth(authorization: str | None) -> None:
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
 
-    # Expected format: "Bearer <token>"
-    parts = authorization.split(" ", 1)
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    # Expected format: "Bearer <token>" (scheme is case-insensitive)
+    if authorization[:7].lower() != "bearer ":
         raise HTTPException(status_code=401, detail="Invalid authorization format")
 
-    if parts[1] != DEBUG_AUTH_TOKEN:
+    # Constant-time comparison so the token cannot be probed byte by byte
+    if not hmac.compare_digest(authorization[7:].encode(), _DEBUG_AUTH_TOKEN_BYTES):
         raise HTTPException(status_code=403, detail="Invalid token")
 
 
-@app.post("/v1/debug/context", response_model=ProjectContext, tags=["debug"])
+@app.post(
+    "/v1/debug/context",
+    response_model=None,
+    responses={200: {"model": ProjectContext}},
+    tags=["debug"],
+    dependencies=[Depends(verify_debug_auth)],
+)
 async def debug_context(
     repository: RepositoryPointer,
-    authorization: str | None = Header(None),
-) -> ProjectContext | JSONResponse:
+    http_request: Request,
+) -> Response:
     """Debug endpoint to fetch repository context.
 
     This endpoint uses the configured context driver to return
-    ProjectContext for a given repository. Protected by auth stub.
+    ProjectContext for a given repository. Protected by the verify_debug_auth
+    dependency.
 
     Args:
         repository: The repository to fetch context for.
-        authorization: Bearer token for authentication.
+        http_request: The raw request, used to reach app-scoped collaborators.
 
     Returns:
-        ProjectContext for the specified repository on success.
-        JSONResponse with structured error (including request_id, no run_id)
+        Serialized ProjectContext for the specified repository on success.
+        JSON Response with structured error (including request_id, no run_id)
         if fixtures are missing.
     """
-    _verify_debug_auth(authorization)
-
-    logger = get_logger(__name__)
     request_id = uuid4()
+    request_id_str = str(request_id)
 
     logger.debug(
         "debug_context_request",
-        request_id=str(request_id),
-        repository=f"{repository.owner}/{repository.name}",
+        request_id=request_id_str,
+        repository=repository.full_name,
     )
 
-    driver = get_context_driver()
+    driver = _collaborator(http_request, "context_driver", get_context_driver)
     try:
-        return driver.fetch_context(repository)
+        # Drivers are blocking (fixture reads, GitHub calls); keep them off
+        # the event loop as create_plan does.
+        project_context = await run_in_threadpool(driver.fetch_context, repository)
+        return _model_response(project_context)
     except FileNotFoundError as e:
         logger.error(
             "debug_context_fixture_missing",
-            request_id=str(request_id),
+            request_id=request_id_str,
             error=str(e),
         )
-        error_response = ErrorResponse(
-            error=ErrorDetail(
-                code="FIXTURE_NOT_FOUND",
-                message=str(e),
-            ),
-            request_id=request_id,
-        )
-        return JSONResponse(
-            status_code=500,
-            content=error_response.model_dump(mode="json", exclude_none=True),
+        return _error_response(
+            500,
+            "FIXTURE_NOT_FOUND",
+            str(e),
+            request_id,
         )
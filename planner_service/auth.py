@@ -18,13 +18,15 @@
 # ============================================================
 """Authentication context and dependency for the planner service."""
 
-from typing import Optional
+from typing import Annotated, Optional
 
 from fastapi import Header
 from pydantic import BaseModel, Field
 
 from planner_service.logging import get_logger
 
+logger = get_logger(__name__)
+
 
 class AuthContext(BaseModel):
     """Authentication context for the current request."""
@@ -34,7 +36,7 @@ class AuthContext(BaseModel):
 
 
 def get_current_user(
-    authorization: Optional[str] = Header(None),
+    authorization: Annotated[Optional[str], Header()] = None,
 ) -> AuthContext:
     """Parse Authorization header and return authentication context.
 
@@ -48,8 +50,6 @@ def get_current_user(
     Returns:
         AuthContext with user_id (stub user if header missing).
     """
-    logger = get_logger(__name__)
-
     if not authorization:
         logger.warning(
             "auth_header_missing",
@@ -57,16 +57,15 @@ def get_current_user(
         )
         return AuthContext(user_id="stub-user", token=None)
 
-    # Expected format: "Bearer <token>"
-    parts = authorization.split(" ", 1)
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    # Expected format: "Bearer <token>" (scheme is case-insensitive)
+    if authorization[:7].lower() != "bearer ":
         logger.warning(
             "auth_header_invalid_format",
             message="Invalid authorization format, using stub user",
         )
         return AuthContext(user_id="stub-user", token=None)
 
-    token = parts[1]
+    token = authorization[7:]
     # Stub implementation: extract user from token or use default
     # In production, this would validate the token and extract user identity
     logger.debug("auth_token_received", token_length=len(token))
@@ -19,12 +19,20 @@
 """Context driver abstraction for fetching repository context (AF v1.1)."""
 
 import json
+from collections.abc import Mapping
+from functools import cache, lru_cache
 from importlib import resources
-from typing import Protocol, runtime_checkable
+from types import MappingProxyType
+from typing import Any, Protocol, runtime_checkable
 
 from planner_service.logging import get_logger
 from planner_service.models import ProjectContext, RepositoryPointer
 
+logger = get_logger(__name__)
+
+# Maximum number of distinct repository coordinates memoized per stub driver
+CONTEXT_CACHE_SIZE = 256
+
 
 @runtime_checkable
 class ContextDriver(Protocol):
@@ -59,14 +67,28 @@ class StubContextDriver:
 
     def __init__(self) -> None:
         """Initialize the stub driver and load fixtures."""
-        self._fixtures: dict | None = None
-        self._logger = get_logger(__name__)
+        self._fixtures: Mapping[str, Any] | None = None
+        self._repositories: Mapping[str, dict] = {}
+        self._default: dict = {}
+        # Fixtures are immutable for the life of the process, so the context
+        # built for a given (owner, name, ref) can be reused across requests.
+        # The cache holds a bound method, forming an instance/cache reference
+        # cycle; that is acceptable because get_context_driver() keeps one
+        # driver for the life of the process, and stray instances (tests) are
+        # reclaimed by the cyclic garbage collector.
+        self._build_context = lru_cache(maxsize=CONTEXT_CACHE_SIZE)(
+            self._build_context_uncached
+        )
 
-    def _load_fixtures(self) -> dict:
+    def _load_fixtures(self) -> Mapping[str, Any]:
         """Load mock context fixtures from bundled resource.
 
+        The file is parsed once; the result is exposed read-only so it can be
+        shared between worker threads, and the repository table and default
+        entry are kept as attributes for direct lookup.
+
         Returns:
-            Dictionary containing mock context data.
+            Read-only mapping containing mock context data.
 
         Raises:
             FileNotFoundError: If the fixture file is missing.
@@ -78,11 +100,13 @@ class StubContextDriver:
             fixture_path = resources.files("planner_service.resources").joinpath(
                 "mock_context.json"
             )
-            with fixture_path.open("r") as f:
-                self._fixtures = json.load(f)
+            fixtures = json.loads(fixture_path.read_bytes())
+            self._repositories = fixtures.get("repositories", {})
+            self._default = fixtures.get("default", {})
+            self._fixtures = MappingProxyType(fixtures)
             return self._fixtures
         except FileNotFoundError as e:
-            self._logger.error(
+            logger.error(
                 "fixture_file_missing",
                 error=str(e),
             )
@@ -99,16 +123,30 @@ class StubContextDriver:
         Returns:
             ProjectContext with mock data from fixtures (AF v1.1 format).
         """
-        fixtures = self._load_fixtures()
-        repo_key = f"{repo.owner}/{repo.name}"
+        return self._build_context(repo.owner, repo.name, repo.ref)
+
+    def _build_context_uncached(
+        self, owner: str, name: str, ref: str
+    ) -> ProjectContext:
+        """Build a ProjectContext for the given coordinates from loaded fixtures.
+
+        Args:
+            owner: Repository owner.
+            name: Repository name.
+            ref: Git ref.
+
+        Returns:
+            ProjectContext with mock data from fixtures (AF v1.1 format).
+        """
+        self._load_fixtures()
+        repo_key = f"{owner}/{name}"
 
         # Check for specific repository data
-        if repo_key in fixtures.get("repositories", {}):
-            repo_data = fixtures["repositories"][repo_key]
-        else:
+        repo_data = self._repositories.get(repo_key)
+        if repo_data is None:
             # Fall back to default mock data
-            repo_data = fixtures.get("default", {})
-            self._logger.debug(
+            repo_data = self._default
+            logger.debug(
                 "using_default_mock_context",
                 repository=repo_key,
             )
@@ -116,26 +154,28 @@ class StubContextDriver:
         # Return ProjectContext in AF v1.1 format
         # Default to "{}" for JSON artifact strings when empty to satisfy strict typing
         return ProjectContext(
-            repo_owner=repo.owner,
-            repo_name=repo.name,
-            ref=repo.ref,
+            repo_owner=owner,
+            repo_name=name,
+            ref=ref,
             tree_json=repo_data.get("tree_json") or "{}",
             dependency_json=repo_data.get("dependency_json") or "{}",
             summary_json=repo_data.get("summary_json") or "{}",
         )
 
 
+@cache
 def get_context_driver() -> ContextDriver:
     """Factory function to get the appropriate context driver.
 
     Attempts to import and use the private backend (af_github_core)
     if available, falling back to StubContextDriver on ImportError.
 
+    The result is memoized, so the backend import is attempted once per
+    process and every caller shares the same instance.
+
     Returns:
         An instance of ContextDriver (either private backend or stub).
     """
-    logger = get_logger(__name__)
-
     try:
         # Attempt to import private backend
         from af_github_core import GitHubContextDriver  # type: ignore[import-not-found]
@@ -19,11 +19,18 @@
 """Structlog configuration for the planner service."""
 
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 
 import structlog
 
+# Background thread that drains queued log records to stdout. Request
+# handlers only enqueue, so a slow or blocked stdout never stalls the
+# event loop.
+_listener: logging.handlers.QueueListener | None = None
+
 
 def get_log_level() -> int:
     """Get log level from environment with safe default."""
@@ -31,17 +38,30 @@ def get_log_level() -> int:
     return getattr(logging, level_name, logging.INFO)
 
 
+def _stdout_handler() -> logging.Handler:
+    """Create the handler that performs the actual write to stdout."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
 def configure_logging(service_name: str = "planner-service") -> None:
     """Configure structlog with service tag and standard processors.
 
+    Events are rendered by structlog in the calling thread and handed to
+    stdlib logging, whose root logger has a single QueueHandler. A
+    QueueListener thread performs the stdout writes. Calling this again
+    replaces the previous pipeline.
+
     Args:
         service_name: Name of the service to include in log events.
     """
+    global _listener
+
     shared_processors: list[structlog.types.Processor] = [
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
     ]
 
     if sys.stderr.isatty():
@@ -53,7 +73,7 @@ def configure_logging(service_name: str = "planner-service") -> None:
             ],
             wrapper_class=structlog.make_filtering_bound_logger(get_log_level()),
             context_class=dict,
-            logger_factory=structlog.PrintLoggerFactory(),
+            logger_factory=structlog.stdlib.LoggerFactory(),
             cache_logger_on_first_use=True,
         )
     else:
@@ -66,16 +86,34 @@ def configure_logging(service_name: str = "planner-service") -> None:
             ],
             wrapper_class=structlog.make_filtering_bound_logger(get_log_level()),
             context_class=dict,
-            logger_factory=structlog.PrintLoggerFactory(),
+            logger_factory=structlog.stdlib.LoggerFactory(),
             cache_logger_on_first_use=True,
         )
 
-    # Set up stdlib logging to use structlog
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=get_log_level(),
-    )
+    # Route stdlib logging (and structlog through it) into the queue
+    if _listener is not None:
+        _listener.stop()
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(get_log_level())
+    _listener = logging.handlers.QueueListener(log_queue, _stdout_handler())
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued log records and stop the background listener.
+
+    Afterwards the root logger writes to stdout directly, so events logged
+    during interpreter shutdown are not lost.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    logging.getLogger().handlers = [_stdout_handler()]
 
 
 def get_logger(name: str | None = None) -> structlog.BoundLogger:
@@ -84,8 +122,11 @@ def get_logger(name: str | None = None) -> structlog.BoundLogger:
     Args:
         name: Optional logger name (typically module name).
 
+    The returned logger is a lazy proxy: the service tag is carried as an
+    initial value and the logger is only assembled on first use, so it is
+    safe to create at module import time before configure_logging() runs.
+
     Returns:
         A bound structlog logger with service tag.
     """
-    logger = structlog.get_logger(name)
-    return logger.bind(service="planner-service")
+    return structlog.get_logger(name, service="planner-service")
@@ -55,8 +55,12 @@ def _validate_non_empty_strings(value: list[str], field_name: str = "list") -> l
     Raises:
         ValueError: If any string is empty or contains only whitespace.
     """
+    # Fast path: strip() yields "" for empty/whitespace-only items, and
+    # all(map(...)) runs the whole check without a Python-level loop.
+    if all(map(str.strip, value)):
+        return value
     for i, item in enumerate(value):
-        if not item or not item.strip():
+        if not item.strip():
             raise ValueError(
                 f"'{field_name}' item at index {i} must be a non-empty string"
             )
@@ -69,7 +73,7 @@ class RepositoryPointer(BaseModel):
     The canonical coordinate for a repository consists of owner, name, and ref.
     """
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     owner: str = Field(..., description="Repository owner (user or organization)")
     name: str = Field(..., description="Repository name")
@@ -78,6 +82,16 @@ class RepositoryPointer(BaseModel):
         description="Git ref (branch, tag, or commit SHA)",
     )
 
+    @property
+    def full_name(self) -> str:
+        """The ``owner/name`` string.
+
+        A plain property rather than a computed field, so it is not part of
+        the serialized model or its schema. Not cached: a cached value would
+        survive ``model_copy(update=...)`` and go stale.
+        """
+        return f"{self.owner}/{self.name}"
+
 
 class UserInput(BaseModel):
     """User-provided input for the planning request (AF v1.1).
@@ -86,7 +100,7 @@ class UserInput(BaseModel):
     Uses StrictStr to reject non-string values without coercion.
     """
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     purpose: StrictStr = Field(
         ..., description="The purpose or goal of the planning request"
@@ -124,7 +138,7 @@ class ProjectContext(BaseModel):
     Decoupled from request types for internal runtime use.
     """
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     repo_owner: str = Field(..., description="Repository owner (user or organization)")
     repo_name: str = Field(..., description="Repository name")
@@ -149,7 +163,7 @@ class PlanningContext(BaseModel):
     Links request_id, UserInput, and a list of ProjectContext entries.
     """
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     request_id: UUID = Field(
         ..., description="Request identifier for tracking"
@@ -163,7 +177,7 @@ class PlanningContext(BaseModel):
 class PlanRequest(BaseModel):
     """Request model for the /v1/plan endpoint (AF v1.1)."""
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     repository: RepositoryPointer = Field(..., description="Target repository")
     user_input: UserInput = Field(..., description="User's planning input")
@@ -176,7 +190,7 @@ class PlanRequest(BaseModel):
 class PlanStep(BaseModel):
     """A single step in a generated plan."""
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     step_number: int = Field(..., description="Order of this step in the plan")
     description: str = Field(..., description="Description of what this step does")
@@ -191,7 +205,7 @@ class PlanResponse(BaseModel):
     Includes status/payload/run_id rules per the stricter contract.
     """
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     request_id: UUID = Field(
         ..., description="Request ID (echoed from request or server-generated)"
@@ -210,7 +224,7 @@ class PlanResponse(BaseModel):
 class ErrorDetail(BaseModel):
     """Detailed error information."""
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     code: str = Field(..., description="Error code for programmatic handling")
     message: str = Field(..., description="Human-readable error message")
@@ -225,7 +239,7 @@ class ErrorResponse(BaseModel):
     Error responses include request_id but omit run_id to indicate no run was created.
     """
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     error: ErrorDetail
     request_id: UUID = Field(
@@ -237,7 +251,7 @@ class ErrorResponse(BaseModel):
 class HealthResponse(BaseModel):
     """Response model for health check endpoint."""
 
-    model_config = ConfigDict(extra="forbid")
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     status: str = Field(..., description="Health status (healthy/unhealthy)")
     service: str = Field(..., description="Service name")
@@ -23,11 +23,14 @@ ensuring candidate payloads meet structural requirements before being
 sent to clients.
 """
 
+from functools import cache
 from typing import Protocol, runtime_checkable
 
 from planner_service.logging import get_logger
 from planner_service.models import PlanningContext
 
+logger = get_logger(__name__)
+
 
 class PlanValidationFailure(Exception):
     """Exception raised when plan validation fails.
@@ -80,6 +83,8 @@ class StubPlanValidator:
     deep validation of field values beyond type checking.
     """
 
+    __slots__ = ()
+
     def validate(self, ctx: PlanningContext, candidate_payload: object) -> dict:
         """Validate the candidate payload structure.
 
@@ -94,6 +99,15 @@ class StubPlanValidator:
             PlanValidationFailure: If the payload is not a dict or
                 is missing required keys.
         """
+        # Fast path for the common valid payload: one lookup per key and no
+        # branching into the per-failure diagnostics below.
+        if (
+            isinstance(candidate_payload, dict)
+            and isinstance(candidate_payload.get("request_id"), str)
+            and isinstance(candidate_payload.get("plan_version"), str)
+        ):
+            return candidate_payload
+
         # Check that candidate_payload is a dict
         if not isinstance(candidate_payload, dict):
             payload_type = type(candidate_payload).__name__
@@ -136,17 +150,19 @@ class StubPlanValidator:
         return candidate_payload
 
 
+@cache
 def get_plan_validator() -> PlanValidator:
     """Factory function to get the appropriate plan validator.
 
     Attempts to import and use a private backend (af_plan_validator)
     if available, falling back to StubPlanValidator on ImportError.
 
+    The result is memoized, so the backend import is attempted once per
+    process and every caller shares the same instance.
+
     Returns:
         An instance of PlanValidator (either private backend or stub).
     """
-    logger = get_logger(__name__)
-
     try:
         # Attempt to import private backend
         from af_plan_validator import PlanValidatorBackend  # type: ignore[import-not-found]
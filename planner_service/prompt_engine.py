@@ -18,11 +18,14 @@
 # ============================================================
 """Prompt engine abstraction for delegating plan generation to pluggable prompt logic (AF v1.1)."""
 
+from functools import cache
 from typing import Protocol, runtime_checkable
 
 from planner_service.logging import get_logger
 from planner_service.models import PlanningContext
 
+logger = get_logger(__name__)
+
 
 @runtime_checkable
 class PromptEngine(Protocol):
@@ -61,9 +64,7 @@ class StubPromptEngine:
     for debugging purposes.
     """
 
-    def __init__(self) -> None:
-        """Initialize the stub prompt engine."""
-        self._logger = get_logger(__name__)
+    __slots__ = ()
 
     def run(self, ctx: PlanningContext) -> dict:
         """Generate deterministic plan output from the given context.
@@ -82,52 +83,42 @@ class StubPromptEngine:
         # Extract repository metadata from the first/primary project context
         project = ctx.projects[0] if ctx.projects else None
         if project:
-            repository_metadata = {
-                "owner": project.repo_owner,
-                "name": project.repo_name,
-                "ref": project.ref,
-            }
-            repo_str = f"{project.repo_owner}/{project.repo_name}"
+            owner = project.repo_owner
+            name = project.repo_name
+            repository_metadata = {"owner": owner, "name": name, "ref": project.ref}
+            repo_str = f"{owner}/{name}"
         else:
             repository_metadata = {"owner": "", "name": "", "ref": ""}
             repo_str = "unknown/unknown"
 
         # Log request metadata for debugging
-        self._logger.info(
+        logger.info(
             "stub_prompt_engine_run",
             request_id=request_id,
             repository=repo_str,
         )
 
         # Build deterministic prompt preview (does not expose real prompts)
-        base_preview = f"[STUB] Planning request for {repo_str}: "
         purpose = ctx.user_input.purpose
-        if len(purpose) > 50:
-            prompt_preview = f"{base_preview}{purpose[:50]}..."
-        else:
-            prompt_preview = f"{base_preview}{purpose}"
+        suffix = purpose if len(purpose) <= 50 else purpose[:50] + "..."
+        prompt_preview = f"[STUB] Planning request for {repo_str}: {suffix}"
 
-        # Mirror user_input data for validator inspection
+        # Mirror user_input data for validator inspection. The lists are
+        # shared with the (frozen) request model rather than copied; the
+        # payload is only validated and serialized, never mutated.
+        user_input = ctx.user_input
         user_input_mirror = {
-            "purpose": ctx.user_input.purpose,
-            "vision": ctx.user_input.vision,
-            "must": list(ctx.user_input.must),
-            "dont": list(ctx.user_input.dont),
-            "nice": list(ctx.user_input.nice),
+            "purpose": user_input.purpose,
+            "vision": user_input.vision,
+            "must": user_input.must,
+            "dont": user_input.dont,
+            "nice": user_input.nice,
         }
 
-        # Mirror context data (projects list) for validator inspection
-        context_mirror = [
-            {
-                "repo_owner": p.repo_owner,
-                "repo_name": p.repo_name,
-                "ref": p.ref,
-                "tree_json": p.tree_json,
-                "dependency_json": p.dependency_json,
-                "summary_json": p.summary_json,
-            }
-            for p in ctx.projects
-        ]
+        # Mirror context data (projects list) for validator inspection. Stub
+        # contexts are shared across requests, so each run dumps fresh dicts
+        # that the validator or client may mutate freely.
+        context_mirror = [p.model_dump() for p in ctx.projects]
 
         return {
             "request_id": request_id,
@@ -140,17 +131,19 @@ class StubPromptEngine:
         }
 
 
+@cache
 def get_prompt_engine() -> PromptEngine:
     """Factory function to get the appropriate prompt engine.
 
     Attempts to import and use the private backend (af_prompt_core)
     if available, falling back to StubPromptEngine on ImportError.
 
+    The result is memoized, so the backend import is attempted once per
+    process and every caller shares the same instance.
+
     Returns:
         An instance of PromptEngine (either private backend or stub).
     """
-    logger = get_logger(__name__)
-
     try:
         # Attempt to import private backend
         from af_prompt_core import PromptEngineBackend  # type: ignore[import-not-found]
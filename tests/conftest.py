@@ -0,0 +1,91 @@
+# ============================================================
+# SPDX-License-Identifier: GPL-3.0-or-later
+# This program was generated as part of the AgentFoundry project.
+# Copyright (C) 2025  John Brosnihan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ============================================================
+"""Shared pytest fixtures for the planner service tests."""
+
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import pytest
+
+if TYPE_CHECKING:
+    from fastapi.testclient import TestClient
+
+    from planner_service.models import PlanningContext
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator["TestClient"]:
+    """Create one test client for the session with the app lifespan running.
+
+    Tests substitute collaborators either on the stub classes, which also
+    reaches the shared instances held on app.state, or by monkeypatching
+    app.state directly; both are undone per test. FastAPI and the app are
+    imported here rather than at module level, so running only
+    model or driver tests does not load the web stack.
+    """
+    from fastapi.testclient import TestClient
+
+    from planner_service.api import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_context_fixtures() -> None:
+    """Parse the stub fixtures before the first test runs.
+
+    get_context_driver is memoized, so this warms the same driver instance
+    the app lifespan later stores on app.state, keeping the one-off JSON
+    parse out of whichever endpoint test happens to run first.
+    """
+    from planner_service.context_driver import StubContextDriver, get_context_driver
+
+    driver = get_context_driver()
+    if isinstance(driver, StubContextDriver):
+        driver._load_fixtures()
+
+
+@pytest.fixture(scope="session")
+def sample_planning_context() -> "PlanningContext":
+    """Create one sample planning context for the session (AF v1.1).
+
+    The models are frozen, so engine and validator tests can share a single
+    instance instead of rebuilding and revalidating it for every test.
+    """
+    from planner_service.models import PlanningContext, ProjectContext, UserInput
+
+    return PlanningContext(
+        request_id=uuid4(),
+        user_input=UserInput(
+            purpose="Create a new feature for user authentication",
+            vision="A fully functional auth system",
+            must=["Implement login", "Implement logout"],
+            dont=["Use deprecated APIs"],
+            nice=["Add remember me feature"],
+        ),
+        projects=[
+            ProjectContext(
+                repo_owner="test-owner",
+                repo_name="test-repo",
+                ref="refs/heads/main",
+            ),
+        ],
+    )
@@ -25,22 +25,14 @@ from fastapi.testclient import TestClient
 
 from planner_service.api import app
 
-
-@pytest.fixture
-def client() -> TestClient:
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
-
-
-def _make_user_input() -> dict:
-    """Create a valid AF v1.1 user input payload."""
-    return {
-        "purpose": "Create a new feature",
-        "vision": "A fully functional authentication system",
-        "must": ["Implement login", "Implement logout"],
-        "dont": ["Use deprecated APIs"],
-        "nice": ["Add remember me feature"],
-    }
+# Valid AF v1.1 user input payload; tests only read it, so one copy is shared.
+_USER_INPUT: dict = {
+    "purpose": "Create a new feature",
+    "vision": "A fully functional authentication system",
+    "must": ["Implement login", "Implement logout"],
+    "dont": ["Use deprecated APIs"],
+    "nice": ["Add remember me feature"],
+}
 
 
 class TestHealthEndpoint:
@@ -72,7 +64,7 @@ class TestPlanEndpoint:
                 "owner": "test-owner",
                 "name": "test-repo",
             },
-            "user_input": _make_user_input(),
+            "user_input": _USER_INPUT,
         }
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 200
@@ -86,7 +78,7 @@ class TestPlanEndpoint:
                 "owner": "test-owner",
                 "name": "test-repo",
             },
-            "user_input": _make_user_input(),
+            "user_input": _USER_INPUT,
         }
         response = client.post("/v1/plan", json=payload)
         data = response.json()
@@ -107,7 +99,7 @@ class TestPlanEndpoint:
                 "owner": "test-owner",
                 "name": "test-repo",
             },
-            "user_input": _make_user_input(),
+            "user_input": _USER_INPUT,
             "request_id": client_request_id,
         }
         response = client.post("/v1/plan", json=payload)
@@ -119,7 +111,7 @@ class TestPlanEndpoint:
     ) -> None:
         """Plan endpoint returns validation error for missing repository."""
         payload = {
-            "user_input": _make_user_input(),
+            "user_input": _USER_INPUT,
         }
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 422
@@ -148,7 +140,7 @@ class TestPlanEndpoint:
                 "name": "test-repo",
                 "ref": "refs/heads/feature",
             },
-            "user_input": _make_user_input(),
+            "user_input": _USER_INPUT,
         }
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 200
@@ -175,6 +167,26 @@ class TestModels:
         )
         assert pointer.ref == "refs/heads/feature"
 
+    def test_repository_pointer_full_name(self) -> None:
+        """RepositoryPointer exposes owner/name without serializing it."""
+        from planner_service.models import RepositoryPointer
+
+        pointer = RepositoryPointer(owner="test", name="repo")
+        assert pointer.full_name == "test/repo"
+        assert "full_name" not in pointer.model_dump()
+        # Derived on access, so copies with updated fields stay consistent
+        assert pointer.model_copy(update={"owner": "other"}).full_name == "other/repo"
+
+    def test_models_are_frozen(self) -> None:
+        """AF v1.1 models reject attribute assignment after construction."""
+        from pydantic import ValidationError
+
+        from planner_service.models import RepositoryPointer
+
+        pointer = RepositoryPointer(owner="test", name="repo")
+        with pytest.raises(ValidationError):
+            pointer.owner = "other"
+
     def test_plan_response_fields(self) -> None:
         """PlanResponse has correct field structure."""
         from uuid import uuid4
@@ -201,6 +213,67 @@ class TestAppInitialization:
         """App has correct version."""
         assert app.version == "0.1.0"
 
+    def test_lifespan_resolves_collaborators(self, client: TestClient) -> None:
+        """Startup stores the driver, engine and validator on app.state."""
+        from planner_service.context_driver import StubContextDriver
+        from planner_service.plan_validator import StubPlanValidator
+        from planner_service.prompt_engine import StubPromptEngine
+
+        assert isinstance(app.state.context_driver, StubContextDriver)
+        assert isinstance(app.state.prompt_engine, StubPromptEngine)
+        assert isinstance(app.state.plan_validator, StubPlanValidator)
+
+    def test_endpoints_fall_back_without_lifespan(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Without startup, handlers use the memoized collaborator factories."""
+        for name in ("context_driver", "prompt_engine", "plan_validator"):
+            monkeypatch.delattr(app.state, name, raising=False)
+        # Outside a ``with`` block TestClient does not run the lifespan
+        bare_client = TestClient(app)
+
+        plan = bare_client.post(
+            "/v1/plan",
+            json={
+                "repository": {"owner": "test-owner", "name": "test-repo"},
+                "user_input": _USER_INPUT,
+            },
+        )
+        assert plan.status_code == 200
+        assert plan.json()["status"] == "ok"
+
+        context = bare_client.post(
+            "/v1/debug/context",
+            json={"owner": "test-owner", "name": "test-repo"},
+            headers={"Authorization": "Bearer debug-token-stub"},
+        )
+        assert context.status_code == 200
+        assert context.json()["repo_owner"] == "test-owner"
+
+    def test_falsy_collaborator_is_not_replaced(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A configured collaborator is used even when it evaluates falsy."""
+        from planner_service.plan_validator import PlanValidationFailure
+
+        class _EmptyValidator:
+            def __len__(self) -> int:
+                return 0
+
+            def validate(self, ctx: object, candidate_payload: object) -> dict:
+                raise PlanValidationFailure(code="EMPTY", message="falsy validator")
+
+        monkeypatch.setattr(app.state, "plan_validator", _EmptyValidator())
+        response = client.post(
+            "/v1/plan",
+            json={
+                "repository": {"owner": "test-owner", "name": "test-repo"},
+                "user_input": _USER_INPUT,
+            },
+        )
+        assert response.status_code == 422
+        assert response.json()["error"]["code"] == "EMPTY"
+
 
 class TestLogging:
     """Tests for logging configuration."""
@@ -218,3 +291,49 @@ class TestLogging:
 
         # Should not raise any exceptions
         configure_logging()
+
+    def test_configure_logging_routes_through_queue(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Root logger enqueues records until logging is shut down."""
+        import logging
+        import logging.handlers
+
+        from planner_service import logging as planner_logging
+        from planner_service.logging import configure_logging, shutdown_logging
+
+        # Detach the session pipeline so it is neither stopped nor replaced;
+        # monkeypatch reattaches its handlers and listener afterwards.
+        root = logging.getLogger()
+        monkeypatch.setattr(root, "handlers", list(root.handlers))
+        monkeypatch.setattr(planner_logging, "_listener", None)
+
+        configure_logging()
+        handlers = logging.getLogger().handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], logging.handlers.QueueHandler)
+
+        shutdown_logging()
+        handlers = logging.getLogger().handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], logging.StreamHandler)
+
+
+class TestEntryPoint:
+    """Tests for the ``python -m planner_service`` entry point."""
+
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [(None, 1), ("4", 4), ("", 1), ("two", 1), ("0", 1), ("-3", 1)],
+    )
+    def test_env_int_falls_back_on_bad_values(
+        self, monkeypatch: pytest.MonkeyPatch, raw: str | None, expected: int
+    ) -> None:
+        """Unset, non-numeric and non-positive values use the default."""
+        from planner_service.__main__ import _env_int
+
+        if raw is None:
+            monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+        else:
+            monkeypatch.setenv("WEB_CONCURRENCY", raw)
+        assert _env_int("WEB_CONCURRENCY", 1) == expected
@@ -18,14 +18,13 @@
 # ============================================================
 """Tests for context driver abstraction and stub implementation (AF v1.1)."""
 
-import builtins
 import sys
-from unittest.mock import MagicMock, patch
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+from unittest.mock import Mock, patch
 
 import pytest
-from fastapi.testclient import TestClient
 
-from planner_service.api import app
 from planner_service.context_driver import (
     ContextDriver,
     StubContextDriver,
@@ -33,11 +32,21 @@ from planner_service.context_driver import (
 )
 from planner_service.models import RepositoryPointer
 
+if TYPE_CHECKING:
+    from fastapi.testclient import TestClient
 
-@pytest.fixture
-def client() -> TestClient:
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+# Shared pointers; the models are frozen, so tests can reuse them safely
+TEST_REPO = RepositoryPointer(owner="test-owner", name="test-repo")
+UNKNOWN_REPO = RepositoryPointer(owner="unknown", name="unknown-repo")
+EXAMPLE_REPO = RepositoryPointer(owner="example-org", name="example-repo")
+FEATURE_REPO = RepositoryPointer(
+    owner="my-org", name="my-repo", ref="refs/heads/feature"
+)
+
+# Authorization headers for the debug endpoint (token is the default stub)
+VALID_AUTH = {"Authorization": "Bearer debug-token-stub"}
+BAD_FORMAT_AUTH = {"Authorization": "InvalidFormat"}
+WRONG_TOKEN_AUTH = {"Authorization": "Bearer wrong-token"}
 
 
 class TestContextDriverProtocol:
@@ -60,9 +69,7 @@ class TestStubContextDriver:
     def test_fetch_context_returns_project_context(self) -> None:
         """fetch_context returns a valid ProjectContext."""
         driver = StubContextDriver()
-        repo = RepositoryPointer(owner="test-owner", name="test-repo")
-
-        context = driver.fetch_context(repo)
+        context = driver.fetch_context(TEST_REPO)
 
         assert context.repo_owner == "test-owner"
         assert context.repo_name == "test-repo"
@@ -70,9 +77,7 @@ class TestStubContextDriver:
     def test_fetch_context_uses_default_for_unknown_repo(self) -> None:
         """fetch_context returns default data for unknown repository."""
         driver = StubContextDriver()
-        repo = RepositoryPointer(owner="unknown", name="unknown-repo")
-
-        context = driver.fetch_context(repo)
+        context = driver.fetch_context(UNKNOWN_REPO)
 
         # Should have repo coordinates
         assert context.repo_owner == "unknown"
@@ -82,22 +87,28 @@ class TestStubContextDriver:
     def test_fetch_context_deterministic_output(self) -> None:
         """fetch_context returns consistent results across calls."""
         driver = StubContextDriver()
-        repo = RepositoryPointer(owner="example-org", name="example-repo")
-
-        context1 = driver.fetch_context(repo)
-        context2 = driver.fetch_context(repo)
+        context1 = driver.fetch_context(EXAMPLE_REPO)
+        context2 = driver.fetch_context(EXAMPLE_REPO)
 
         assert context1.repo_owner == context2.repo_owner
         assert context1.repo_name == context2.repo_name
 
-    def test_fetch_context_includes_repository_pointer(self) -> None:
-        """fetch_context includes original repository in response."""
+    def test_fetch_context_memoizes_per_coordinate(self) -> None:
+        """fetch_context reuses the built context for identical coordinates."""
         driver = StubContextDriver()
-        repo = RepositoryPointer(
-            owner="my-org", name="my-repo", ref="refs/heads/feature"
+        main = EXAMPLE_REPO
+        feature = RepositoryPointer(
+            owner="example-org", name="example-repo", ref="refs/heads/feature"
         )
 
-        context = driver.fetch_context(repo)
+        assert driver.fetch_context(main) is driver.fetch_context(main)
+        assert driver.fetch_context(feature) is not driver.fetch_context(main)
+        assert driver.fetch_context(feature).ref == "refs/heads/feature"
+
+    def test_fetch_context_includes_repository_pointer(self) -> None:
+        """fetch_context includes original repository in response."""
+        driver = StubContextDriver()
+        context = driver.fetch_context(FEATURE_REPO)
 
         assert context.repo_owner == "my-org"
         assert context.repo_name == "my-repo"
@@ -107,9 +118,7 @@ class TestStubContextDriver:
         """fetch_context returns JSON strings defaulting to '{}' when empty."""
         driver = StubContextDriver()
         # Use a repo that should fall back to default fixture data
-        repo = RepositoryPointer(owner="nonexistent", name="nonexistent-repo")
-
-        context = driver.fetch_context(repo)
+        context = driver.fetch_context(UNKNOWN_REPO)
 
         # JSON artifact strings should default to "{}" not None
         assert context.tree_json is not None
@@ -124,9 +133,7 @@ class TestStubContextDriver:
         import json
 
         driver = StubContextDriver()
-        repo = RepositoryPointer(owner="test-owner", name="test-repo")
-
-        context = driver.fetch_context(repo)
+        context = driver.fetch_context(TEST_REPO)
 
         # All JSON strings should be parseable
         json.loads(context.tree_json)  # Should not raise
@@ -137,6 +144,17 @@ class TestStubContextDriver:
 class TestGetContextDriverFactory:
     """Tests for the get_context_driver factory function."""
 
+    @pytest.fixture(autouse=True)
+    def _reset_factory_cache(self) -> Iterator[None]:
+        """Clear the memoized factory so each test resolves afresh."""
+        get_context_driver.cache_clear()
+        yield
+        get_context_driver.cache_clear()
+
+    def test_returns_same_instance_on_repeat_calls(self) -> None:
+        """Factory resolves the backend once and reuses the instance."""
+        assert get_context_driver() is get_context_driver()
+
     def test_returns_stub_driver_when_private_unavailable(self) -> None:
         """Factory returns StubContextDriver when af_github_core is not available."""
         driver = get_context_driver()
@@ -152,31 +170,20 @@ class TestGetContextDriverFactory:
 
     def test_uses_private_backend_when_available(self) -> None:
         """Factory uses private backend when successfully imported."""
-        mock_driver_instance = MagicMock()
-        mock_github_context_driver = MagicMock(return_value=mock_driver_instance)
+        mock_driver_instance = Mock()
+        mock_github_context_driver = Mock(return_value=mock_driver_instance)
 
-        # Create a mock module with the expected class
-        mock_module = MagicMock()
-        mock_module.GitHubContextDriver = mock_github_context_driver
+        # Register a stand-in module with the expected class
+        mock_module = Mock(GitHubContextDriver=mock_github_context_driver)
 
-        original_import = builtins.__import__
-
-        def mock_import(name, *args, **kwargs):
-            if name == "af_github_core":
-                return mock_module
-            return original_import(name, *args, **kwargs)
-
-        with patch.object(builtins, "__import__", side_effect=mock_import):
+        with patch.dict(sys.modules, {"af_github_core": mock_module}):
             driver = get_context_driver()
             assert driver is mock_driver_instance
             mock_github_context_driver.assert_called_once()
 
     def test_logs_fallback_on_import_error(self) -> None:
         """Factory logs when falling back to stub driver."""
-        with patch("planner_service.context_driver.get_logger") as mock_get_logger:
-            mock_logger = MagicMock()
-            mock_get_logger.return_value = mock_logger
-
+        with patch("planner_service.context_driver.logger") as mock_logger:
             get_context_driver()
 
             # Should have logged the fallback
@@ -190,95 +197,97 @@ class TestGetContextDriverFactory:
 class TestDebugContextEndpoint:
     """Tests for the /v1/debug/context endpoint (AF v1.1)."""
 
-    def test_debug_context_requires_auth(self, client: TestClient) -> None:
-        """Debug endpoint requires authorization header."""
-        payload = {"owner": "test", "name": "test-repo"}
-        response = client.post("/v1/debug/context", json=payload)
-
-        assert response.status_code == 401
-        assert "Authorization header required" in response.json()["error"]["message"]
-
-    def test_debug_context_rejects_invalid_auth_format(
-        self, client: TestClient
+    @pytest.mark.parametrize(
+        ("headers", "status_code", "message"),
+        [
+            pytest.param({}, 401, "Authorization header required", id="missing"),
+            pytest.param(
+                BAD_FORMAT_AUTH,
+                401,
+                "Invalid authorization format",
+                id="malformed",
+            ),
+            pytest.param(
+                WRONG_TOKEN_AUTH,
+                403,
+                "Invalid token",
+                id="wrong-token",
+            ),
+        ],
+    )
+    def test_debug_context_rejects_bad_auth(
+        self,
+        client: "TestClient",
+        headers: dict[str, str],
+        status_code: int,
+        message: str,
     ) -> None:
-        """Debug endpoint rejects malformed authorization header."""
+        """Debug endpoint rejects missing, malformed, or incorrect credentials."""
         payload = {"owner": "test", "name": "test-repo"}
-        response = client.post(
-            "/v1/debug/context",
-            json=payload,
-            headers={"Authorization": "InvalidFormat"},
-        )
-
-        assert response.status_code == 401
-        assert "Invalid authorization format" in response.json()["error"]["message"]
-
-    def test_debug_context_rejects_wrong_token(self, client: TestClient) -> None:
-        """Debug endpoint rejects incorrect token."""
-        payload = {"owner": "test", "name": "test-repo"}
-        response = client.post(
-            "/v1/debug/context",
-            json=payload,
-            headers={"Authorization": "Bearer wrong-token"},
-        )
-
-        assert response.status_code == 403
-        assert "Invalid token" in response.json()["error"]["message"]
-
-    def test_debug_context_returns_context_with_valid_auth(
-        self, client: TestClient
-    ) -> None:
-        """Debug endpoint returns ProjectContext with valid auth."""
-        payload = {"owner": "test-owner", "name": "test-repo"}
-        response = client.post(
-            "/v1/debug/context",
-            json=payload,
-            headers={"Authorization": "Bearer debug-token-stub"},
-        )
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["repo_owner"] == "test-owner"
-        assert data["repo_name"] == "test-repo"
-
-    def test_debug_context_uses_default_for_unknown_repo(
-        self, client: TestClient
+        response = client.post("/v1/debug/context", json=payload, headers=headers)
+
+        assert response.status_code == status_code
+        assert message in response.json()["error"]["message"]
+
+    @pytest.mark.parametrize(
+        ("payload", "headers", "expected"),
+        [
+            pytest.param(
+                {"owner": "test-owner", "name": "test-repo"},
+                VALID_AUTH,
+                {"repo_owner": "test-owner", "repo_name": "test-repo"},
+                id="known-repo",
+            ),
+            pytest.param(
+                {"owner": "unknown", "name": "unknown-repo"},
+                VALID_AUTH,
+                {
+                    "repo_owner": "unknown",
+                    "repo_name": "unknown-repo",
+                    "ref": "refs/heads/main",
+                },
+                id="default-for-unknown-repo",
+            ),
+            pytest.param(
+                {
+                    "owner": "test-owner",
+                    "name": "test-repo",
+                    "ref": "refs/heads/feature",
+                },
+                VALID_AUTH,
+                {"ref": "refs/heads/feature"},
+                id="optional-ref",
+            ),
+            pytest.param(
+                {"owner": "test", "name": "test-repo"},
+                {"Authorization": "bearer debug-token-stub"},
+                {"repo_owner": "test"},
+                id="lowercase-scheme",
+            ),
+        ],
+    )
+    def test_debug_context_returns_context(
+        self,
+        client: "TestClient",
+        payload: dict[str, str],
+        headers: dict[str, str],
+        expected: dict[str, str],
     ) -> None:
-        """Debug endpoint returns default context for unknown repository."""
-        payload = {"owner": "unknown", "name": "unknown-repo"}
-        response = client.post(
-            "/v1/debug/context",
-            json=payload,
-            headers={"Authorization": "Bearer debug-token-stub"},
-        )
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["repo_owner"] == "unknown"
-        assert data["repo_name"] == "unknown-repo"
-        assert data["ref"] == "refs/heads/main"
-
-    def test_debug_context_accepts_optional_ref(self, client: TestClient) -> None:
-        """Debug endpoint accepts optional ref in repository pointer."""
-        payload = {
-            "owner": "test-owner",
-            "name": "test-repo",
-            "ref": "refs/heads/feature",
-        }
-        response = client.post(
-            "/v1/debug/context",
-            json=payload,
-            headers={"Authorization": "Bearer debug-token-stub"},
-        )
+        """Debug endpoint returns ProjectContext for authorized requests."""
+        response = client.post("/v1/debug/context", json=payload, headers=headers)
 
         assert response.status_code == 200
         data = response.json()
-        assert data["ref"] == "refs/heads/feature"
+        for key, value in expected.items():
+            assert data[key] == value
 
     def test_debug_context_returns_structured_error_on_missing_fixture(
-        self, client: TestClient
+        self, client: "TestClient", monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Debug endpoint returns structured error when fixture file is missing."""
-        # Mock the fixture loading to raise FileNotFoundError
+        # A fresh driver has no memoized contexts, so the request must load
+        # fixtures; mock the loading to raise FileNotFoundError
+        monkeypatch.setattr(client.app.state, "context_driver", StubContextDriver())
         with patch.object(
             StubContextDriver,
             "_load_fixtures",
@@ -290,7 +299,7 @@ class TestDebugContextEndpoint:
             response = client.post(
                 "/v1/debug/context",
                 json=payload,
-                headers={"Authorization": "Bearer debug-token-stub"},
+                headers=VALID_AUTH,
             )
 
             assert response.status_code == 500
@@ -18,100 +18,96 @@
 # ============================================================
 """Tests for the POST /v1/plan endpoint including auth, context driver, and prompt engine (AF v1.1)."""
 
+import json
+import re
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import NoReturn
 from unittest.mock import patch
 from uuid import UUID
 
 import pytest
 from fastapi.testclient import TestClient
+from httpx import Response
 
-from planner_service.api import app
+from planner_service.api import _error_response
+from planner_service.auth import AuthContext, get_current_user
+from planner_service.models import PlanResponse
+from planner_service.plan_validator import PlanValidationFailure, StubPlanValidator
 
+_CLIENT_REQUEST_ID = "550e8400-e29b-41d4-a716-446655440000"
 
-@pytest.fixture
-def client() -> TestClient:
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+_UUID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+)
 
+# Valid AF v1.1 user input payload; tests only read it, so one copy is shared.
+_USER_INPUT: dict = {
+    "purpose": "Test query",
+    "vision": "A completed test",
+    "must": ["Pass all tests"],
+    "dont": ["Fail"],
+    "nice": ["Be fast"],
+}
 
-def _make_user_input() -> dict:
-    """Create a valid AF v1.1 user input payload."""
-    return {
-        "purpose": "Test query",
-        "vision": "A completed test",
-        "must": ["Pass all tests"],
-        "dont": ["Fail"],
-        "nice": ["Be fast"],
-    }
+
+def _raising(exc: Exception) -> Callable[..., NoReturn]:
+    """Build a stand-in method that raises ``exc`` whenever it is called."""
+
+    def _raise(*args: object, **kwargs: object) -> NoReturn:
+        raise exc
+
+    return _raise
 
 
 class TestPlanEndpointAuth:
     """Tests for authentication in /v1/plan endpoint."""
 
-    def test_plan_allows_missing_auth_header_with_stub_user(
-        self, client: TestClient
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            pytest.param({}, id="missing-header"),
+            pytest.param({"Authorization": "Bearer test-token-123"}, id="bearer"),
+            pytest.param({"Authorization": "InvalidFormat"}, id="invalid-format"),
+        ],
+    )
+    def test_plan_accepts_any_auth_with_stub_user(
+        self, client: TestClient, headers: dict[str, str]
     ) -> None:
-        """Plan endpoint allows missing auth header (stub user for now)."""
+        """Plan endpoint succeeds with the stub user for any Authorization header."""
         payload = {
             "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
+            "user_input": _USER_INPUT,
         }
-        response = client.post("/v1/plan", json=payload)
-        # Should succeed with stub user
+        response = client.post("/v1/plan", json=payload, headers=headers)
         assert response.status_code == 200
 
-    def test_plan_accepts_bearer_token(self, client: TestClient) -> None:
-        """Plan endpoint accepts Bearer token in Authorization header."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
-        }
-        response = client.post(
-            "/v1/plan",
-            json=payload,
-            headers={"Authorization": "Bearer test-token-123"},
-        )
-        assert response.status_code == 200
 
-    def test_plan_handles_invalid_auth_format_gracefully(
-        self, client: TestClient
-    ) -> None:
-        """Plan endpoint handles invalid auth format with stub user."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
-        }
-        response = client.post(
-            "/v1/plan",
-            json=payload,
-            headers={"Authorization": "InvalidFormat"},
-        )
-        # Should succeed with stub user
-        assert response.status_code == 200
+@pytest.fixture(scope="module")
+def happy_path_response(client: TestClient) -> Response:
+    """POST the valid payload once and share the response across assertions."""
+    payload = {
+        "repository": {"owner": "test-owner", "name": "test-repo"},
+        "user_input": _USER_INPUT,
+    }
+    return client.post("/v1/plan", json=payload)
 
 
 class TestPlanEndpointHappyPath:
     """Tests for successful /v1/plan requests."""
 
-    def test_plan_returns_ok_status(self, client: TestClient) -> None:
+    def test_plan_returns_ok_status(self, happy_path_response: Response) -> None:
         """Plan endpoint returns ok status when prompt engine succeeds."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 200
-        data = response.json()
+        assert happy_path_response.status_code == 200
+        data = happy_path_response.json()
         assert data["status"] == "ok"
 
-    def test_plan_returns_payload_on_success(self, client: TestClient) -> None:
+    def test_plan_returns_payload_on_success(
+        self, happy_path_response: Response
+    ) -> None:
         """Plan endpoint returns engine result in payload when ok."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 200
-        data = response.json()
+        assert happy_path_response.status_code == 200
+        data = happy_path_response.json()
         assert data["status"] == "ok"
         assert data["payload"] is not None
         # Verify payload contains engine result fields
@@ -120,214 +116,226 @@ class TestPlanEndpointHappyPath:
         assert "repository" in data["payload"]
         assert "prompt_preview" in data["payload"]
 
-    def test_plan_returns_request_id_and_run_id(self, client: TestClient) -> None:
+    def test_plan_success_body_matches_plan_response(
+        self, happy_path_response: Response
+    ) -> None:
+        """Plan endpoint success body parses as a PlanResponse."""
+        assert happy_path_response.status_code == 200
+        parsed = PlanResponse.model_validate_json(happy_path_response.content)
+        assert parsed.status == "ok"
+        assert parsed.run_id == parsed.request_id
+
+    def test_plan_returns_request_id_and_run_id(
+        self, happy_path_response: Response
+    ) -> None:
         """Plan endpoint returns valid request_id and run_id."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
-        }
-        response = client.post("/v1/plan", json=payload)
-        data = response.json()
+        data = happy_path_response.json()
 
-        request_id = UUID(data["request_id"])
-        run_id = UUID(data["run_id"])
-        assert request_id is not None
-        assert run_id is not None
+        assert _UUID_RE.match(data["request_id"])
+        assert _UUID_RE.match(data["run_id"])
         # In sync flow, run_id mirrors request_id
-        assert request_id == run_id
+        assert data["request_id"] == data["run_id"]
 
     def test_plan_echoes_client_provided_request_id(self, client: TestClient) -> None:
         """Plan endpoint echoes client-provided request_id."""
-        client_request_id = "550e8400-e29b-41d4-a716-446655440000"
         payload = {
             "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": _make_user_input(),
-            "request_id": client_request_id,
+            "user_input": _USER_INPUT,
+            "request_id": _CLIENT_REQUEST_ID,
         }
         response = client.post("/v1/plan", json=payload)
         data = response.json()
 
-        assert data["request_id"] == client_request_id
-        assert data["run_id"] == client_request_id  # Mirrors request_id
+        assert data["request_id"] == _CLIENT_REQUEST_ID
+        assert data["run_id"] == _CLIENT_REQUEST_ID  # Mirrors request_id
+
+    def test_large_plan_response_is_gzip_encoded(self, client: TestClient) -> None:
+        """Responses above the gzip threshold are compressed when accepted."""
+        payload = {
+            "repository": {"owner": "test-owner", "name": "test-repo"},
+            # The purpose is mirrored into the payload, pushing it past 1 KiB
+            "user_input": {**_USER_INPUT, "purpose": "A" * 2048},
+        }
+        response = client.post(
+            "/v1/plan", json=payload, headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        # httpx decodes transparently, so the body still parses as JSON
+        assert response.json()["payload"]["user_input"]["purpose"] == "A" * 2048
 
 
 class TestPlanEndpointContextDriverFailure:
     """Tests for context driver failures in /v1/plan endpoint."""
 
     def test_plan_returns_5xx_on_context_driver_file_not_found(
-        self, client: TestClient
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Plan endpoint returns 500 when context driver fails with FileNotFoundError."""
-        from planner_service.context_driver import StubContextDriver
-
-        with patch.object(
-            StubContextDriver,
-            "fetch_context",
-            side_effect=FileNotFoundError("Mock fixture missing"),
-        ):
-            payload = {
-                "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
-            }
-            response = client.post("/v1/plan", json=payload)
+        monkeypatch.setattr(
+            client.app.state,
+            "context_driver",
+            SimpleNamespace(
+                fetch_context=_raising(FileNotFoundError("Mock fixture missing"))
+            ),
+        )
+        payload = {
+            "repository": {"owner": "test-owner", "name": "test-repo"},
+            "user_input": _USER_INPUT,
+        }
+        response = client.post("/v1/plan", json=payload)
 
-            assert response.status_code == 500
-            data = response.json()
-            assert "error" in data
-            assert data["error"]["code"] == "CONTEXT_DRIVER_ERROR"
-            assert "request_id" in data
-            assert "run_id" not in data  # No run_id on error
+        assert response.status_code == 500
+        data = response.json()
+        assert "error" in data
+        assert data["error"]["code"] == "CONTEXT_DRIVER_ERROR"
+        assert "request_id" in data
+        assert "run_id" not in data  # No run_id on error
 
     def test_plan_returns_5xx_on_context_driver_unexpected_error(
-        self, client: TestClient
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Plan endpoint returns 500 when context driver fails with unexpected error."""
-        from planner_service.context_driver import StubContextDriver
-
-        with patch.object(
-            StubContextDriver,
-            "fetch_context",
-            side_effect=RuntimeError("Unexpected error"),
-        ):
-            payload = {
-                "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
-            }
-            response = client.post("/v1/plan", json=payload)
+        monkeypatch.setattr(
+            client.app.state,
+            "context_driver",
+            SimpleNamespace(fetch_context=_raising(RuntimeError("Unexpected error"))),
+        )
+        payload = {
+            "repository": {"owner": "test-owner", "name": "test-repo"},
+            "user_input": _USER_INPUT,
+        }
+        response = client.post("/v1/plan", json=payload)
 
-            assert response.status_code == 500
-            data = response.json()
-            assert data["error"]["code"] == "CONTEXT_DRIVER_ERROR"
-            assert "request_id" in data
-            assert "run_id" not in data
+        assert response.status_code == 500
+        data = response.json()
+        assert data["error"]["code"] == "CONTEXT_DRIVER_ERROR"
+        assert "request_id" in data
+        assert "run_id" not in data
 
 
 class TestPlanEndpointPromptEngineFailure:
     """Tests for prompt engine failures in /v1/plan endpoint."""
 
     def test_plan_returns_5xx_on_prompt_engine_failure(
-        self, client: TestClient
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
     ) -> None:
-        """Plan endpoint returns 500 when prompt engine fails."""
-        from planner_service.prompt_engine import StubPromptEngine
+        """Plan endpoint returns 500 and echoes request_id when the engine fails."""
+        monkeypatch.setattr(
+            client.app.state,
+            "prompt_engine",
+            SimpleNamespace(run=_raising(RuntimeError("LLM unavailable"))),
+        )
+        payload = {
+            "repository": {"owner": "test-owner", "name": "test-repo"},
+            "user_input": _USER_INPUT,
+            "request_id": _CLIENT_REQUEST_ID,
+        }
+        response = client.post("/v1/plan", json=payload)
 
-        with patch.object(
-            StubPromptEngine, "run", side_effect=RuntimeError("LLM unavailable")
-        ):
-            payload = {
-                "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
-            }
-            response = client.post("/v1/plan", json=payload)
+        assert response.status_code == 500
+        data = response.json()
+        assert data["error"]["code"] == "PROMPT_ENGINE_ERROR"
+        assert data["request_id"] == _CLIENT_REQUEST_ID
+        assert "run_id" not in data  # No run_id on error
 
-            assert response.status_code == 500
-            data = response.json()
-            assert "error" in data
-            assert data["error"]["code"] == "PROMPT_ENGINE_ERROR"
-            assert "request_id" in data
-            assert "run_id" not in data  # No run_id on error
 
-    def test_plan_preserves_request_id_on_prompt_engine_failure(
-        self, client: TestClient
-    ) -> None:
-        """Plan endpoint preserves client request_id on prompt engine failure."""
-        from planner_service.prompt_engine import StubPromptEngine
+class TestErrorResponse:
+    """Direct tests for the structured error response builder."""
 
-        client_request_id = "550e8400-e29b-41d4-a716-446655440000"
-        with patch.object(
-            StubPromptEngine, "run", side_effect=RuntimeError("LLM unavailable")
-        ):
-            payload = {
-                "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
-                "request_id": client_request_id,
-            }
-            response = client.post("/v1/plan", json=payload)
+    def test_error_response_body_shape(self) -> None:
+        """_error_response serializes code, message and request_id without run_id."""
+        response = _error_response(
+            500, "PROMPT_ENGINE_ERROR", "LLM unavailable", UUID(_CLIENT_REQUEST_ID)
+        )
 
-            assert response.status_code == 500
-            data = response.json()
-            assert data["request_id"] == client_request_id
+        assert response.status_code == 500
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == {
+            "error": {"code": "PROMPT_ENGINE_ERROR", "message": "LLM unavailable"},
+            "request_id": _CLIENT_REQUEST_ID,
+        }
 
 
 class TestPlanEndpointPlanValidationFailure:
     """Tests for plan validation failures in /v1/plan endpoint."""
 
     def test_plan_returns_422_on_validation_failure(
-        self, client: TestClient
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Plan endpoint returns 422 when plan validation fails."""
-        from planner_service.plan_validator import PlanValidationFailure, StubPlanValidator
-
-        with patch.object(
-            StubPlanValidator,
-            "validate",
-            side_effect=PlanValidationFailure(
-                code="MISSING_REQUEST_ID",
-                message="Payload missing required key: request_id",
+        monkeypatch.setattr(
+            client.app.state,
+            "plan_validator",
+            SimpleNamespace(
+                validate=_raising(
+                    PlanValidationFailure(
+                        code="MISSING_REQUEST_ID",
+                        message="Payload missing required key: request_id",
+                    )
+                )
             ),
-        ):
-            payload = {
-                "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
-            }
-            response = client.post("/v1/plan", json=payload)
+        )
+        payload = {
+            "repository": {"owner": "test-owner", "name": "test-repo"},
+            "user_input": _USER_INPUT,
+        }
+        response = client.post("/v1/plan", json=payload)
 
-            assert response.status_code == 422
-            data = response.json()
-            assert "error" in data
-            assert data["error"]["code"] == "MISSING_REQUEST_ID"
-            assert "request_id" in data
-            assert "run_id" not in data  # No run_id on error
+        assert response.status_code == 422
+        data = response.json()
+        assert "error" in data
+        assert data["error"]["code"] == "MISSING_REQUEST_ID"
+        assert "request_id" in data
+        assert "run_id" not in data  # No run_id on error
 
     def test_plan_preserves_request_id_on_validation_failure(
-        self, client: TestClient
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Plan endpoint preserves client request_id on validation failure."""
-        from planner_service.plan_validator import PlanValidationFailure, StubPlanValidator
-
-        client_request_id = "550e8400-e29b-41d4-a716-446655440000"
-        with patch.object(
-            StubPlanValidator,
-            "validate",
-            side_effect=PlanValidationFailure(
-                code="INVALID_PAYLOAD_TYPE",
-                message="Expected dict payload, got NoneType",
+        monkeypatch.setattr(
+            client.app.state,
+            "plan_validator",
+            SimpleNamespace(
+                validate=_raising(
+                    PlanValidationFailure(
+                        code="INVALID_PAYLOAD_TYPE",
+                        message="Expected dict payload, got NoneType",
+                    )
+                )
             ),
-        ):
-            payload = {
-                "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
-                "request_id": client_request_id,
-            }
-            response = client.post("/v1/plan", json=payload)
+        )
+        payload = {
+            "repository": {"owner": "test-owner", "name": "test-repo"},
+            "user_input": _USER_INPUT,
+            "request_id": _CLIENT_REQUEST_ID,
+        }
+        response = client.post("/v1/plan", json=payload)
 
-            assert response.status_code == 422
-            data = response.json()
-            assert data["request_id"] == client_request_id
-            assert data["error"]["code"] == "INVALID_PAYLOAD_TYPE"
+        assert response.status_code == 422
+        data = response.json()
+        assert data["request_id"] == _CLIENT_REQUEST_ID
+        assert data["error"]["code"] == "INVALID_PAYLOAD_TYPE"
 
 
 class TestPlanEndpointValidation:
     """Tests for request validation in /v1/plan endpoint (AF v1.1)."""
 
-    def test_plan_missing_repository_returns_422_with_request_id(
-        self, client: TestClient
-    ) -> None:
-        """Plan endpoint returns 422 with request_id for missing repository."""
-        payload = {"user_input": _make_user_input()}
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-        data = response.json()
-        assert "error" in data
-        assert data["error"]["code"] == "VALIDATION_ERROR"
-        assert "request_id" in data
-        assert "run_id" not in data  # No run_id on error
-
-    def test_plan_missing_user_input_returns_422_with_request_id(
-        self, client: TestClient
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            pytest.param({"user_input": _USER_INPUT}, id="missing-repository"),
+            pytest.param(
+                {"repository": {"owner": "test-owner", "name": "test-repo"}},
+                id="missing-user-input",
+            ),
+        ],
+    )
+    def test_plan_missing_field_returns_422_with_request_id(
+        self, client: TestClient, payload: dict
     ) -> None:
-        """Plan endpoint returns 422 with request_id for missing user_input."""
-        payload = {"repository": {"owner": "test-owner", "name": "test-repo"}}
+        """Plan endpoint returns 422 with request_id when a required key is missing."""
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 422
         data = response.json()
@@ -340,175 +348,71 @@ class TestPlanEndpointValidation:
         self, client: TestClient
     ) -> None:
         """Plan endpoint echoes client-provided request_id on validation errors."""
-        client_request_id = "550e8400-e29b-41d4-a716-446655440000"
         payload = {
-            "user_input": _make_user_input(),
-            "request_id": client_request_id,
+            "user_input": _USER_INPUT,
+            "request_id": _CLIENT_REQUEST_ID,
         }
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 422
         data = response.json()
-        assert data["request_id"] == client_request_id
+        assert data["request_id"] == _CLIENT_REQUEST_ID
         assert "run_id" not in data
 
-    def test_plan_rejects_empty_must_list_entries(self, client: TestClient) -> None:
-        """Plan endpoint rejects empty strings in must list."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test",
-                "vision": "Test vision",
-                "must": ["Valid", ""],  # Empty string should fail
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-
-    def test_plan_rejects_whitespace_only_entries(self, client: TestClient) -> None:
-        """Plan endpoint rejects whitespace-only strings in lists."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test",
-                "vision": "Test vision",
-                "must": ["Valid", "   "],  # Whitespace only should fail
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-
-    def test_plan_rejects_extra_user_input_keys(self, client: TestClient) -> None:
-        """Plan endpoint rejects unexpected keys in user_input (AF v1.1)."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test",
-                "vision": "Test vision",
-                "must": ["Valid"],
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-                "extra_key": "should fail",  # Extra key not allowed
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-
-    def test_plan_rejects_empty_purpose(self, client: TestClient) -> None:
-        """Plan endpoint rejects empty purpose string."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "",  # Empty string should fail
-                "vision": "Test vision",
-                "must": ["Valid"],
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-
-    def test_plan_rejects_whitespace_only_purpose(self, client: TestClient) -> None:
-        """Plan endpoint rejects whitespace-only purpose string."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "   ",  # Whitespace only should fail
-                "vision": "Test vision",
-                "must": ["Valid"],
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-
-    def test_plan_rejects_empty_vision(self, client: TestClient) -> None:
-        """Plan endpoint rejects empty vision string."""
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test purpose",
-                "vision": "",  # Empty string should fail
-                "must": ["Valid"],
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
-
-    def test_plan_rejects_whitespace_only_vision(self, client: TestClient) -> None:
-        """Plan endpoint rejects whitespace-only vision string."""
+    def test_plan_validation_error_generates_request_id_when_malformed(
+        self, client: TestClient
+    ) -> None:
+        """Plan endpoint generates a request_id when the client one is malformed."""
         payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test purpose",
-                "vision": "   ",  # Whitespace only should fail
-                "must": ["Valid"],
-                "dont": ["Fail"],
-                "nice": ["Be fast"],
-            },
+            "user_input": _USER_INPUT,
+            "request_id": "not-a-uuid",
         }
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 422
+        data = response.json()
+        assert _UUID_RE.match(data["request_id"])
+        assert "run_id" not in data
 
-    def test_plan_rejects_non_string_list_items(self, client: TestClient) -> None:
-        """Plan endpoint rejects non-string items in lists (strict typing)."""
+    @pytest.mark.parametrize(
+        ("field", "value"),
+        [
+            pytest.param("must", ["Valid", ""], id="empty-must-entry"),
+            pytest.param("must", ["Valid", "   "], id="whitespace-must-entry"),
+            pytest.param("extra_key", "should fail", id="extra-key"),
+            pytest.param("purpose", "", id="empty-purpose"),
+            pytest.param("purpose", "   ", id="whitespace-purpose"),
+            pytest.param("vision", "", id="empty-vision"),
+            pytest.param("vision", "   ", id="whitespace-vision"),
+            pytest.param("must", [123], id="non-string-list-item"),
+            pytest.param("purpose", 123, id="non-string-purpose"),
+            pytest.param("vision", True, id="non-string-vision"),
+        ],
+    )
+    def test_plan_rejects_invalid_user_input(
+        self, client: TestClient, field: str, value: object
+    ) -> None:
+        """Plan endpoint rejects empty, whitespace-only, non-string, or extra fields."""
         payload = {
             "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test purpose",
-                "vision": "Test vision",
-                "must": [123],  # Non-string should fail with StrictStr
-                "dont": ["Valid"],
-                "nice": ["Be fast"],
-            },
+            "user_input": {**_USER_INPUT, field: value},
         }
         response = client.post("/v1/plan", json=payload)
         assert response.status_code == 422
 
-    def test_plan_rejects_non_string_purpose_vision(self, client: TestClient) -> None:
-        """Plan endpoint rejects non-string purpose/vision (strict typing)."""
-        # Test non-string purpose
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": 123,  # Non-string should fail with StrictStr
-                "vision": "Test vision",
-                "must": ["Required"],
-                "dont": ["Avoid this"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
 
-        # Test non-string vision
-        payload = {
-            "repository": {"owner": "test-owner", "name": "test-repo"},
-            "user_input": {
-                "purpose": "Test purpose",
-                "vision": True,  # Non-string should fail with StrictStr
-                "must": ["Required"],
-                "dont": ["Avoid this"],
-                "nice": ["Be fast"],
-            },
-        }
-        response = client.post("/v1/plan", json=payload)
-        assert response.status_code == 422
+@pytest.fixture(scope="module")
+def health_responses(client: TestClient) -> tuple[Response, Response]:
+    """GET /health and /healthz once each and share them across assertions."""
+    return client.get("/health"), client.get("/healthz")
 
 
 class TestHealthEndpoints:
     """Tests for health check endpoints."""
 
-    def test_healthz_returns_healthy(self, client: TestClient) -> None:
+    def test_healthz_returns_healthy(
+        self, health_responses: tuple[Response, Response]
+    ) -> None:
         """Healthz endpoint returns healthy status."""
-        response = client.get("/healthz")
+        _, response = health_responses
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
@@ -516,88 +420,82 @@ class TestHealthEndpoints:
         assert "version" in data
 
     def test_health_and_healthz_return_same_response(
-        self, client: TestClient
+        self, health_responses: tuple[Response, Response]
     ) -> None:
         """Both health endpoints return equivalent response."""
-        health_response = client.get("/health")
-        healthz_response = client.get("/healthz")
+        health_response, healthz_response = health_responses
 
         assert health_response.status_code == healthz_response.status_code
         assert health_response.json() == healthz_response.json()
 
+    def test_health_is_not_gzip_encoded(self, client: TestClient) -> None:
+        """Health body stays below the gzip threshold and is sent as is."""
+        response = client.get("/healthz", headers={"Accept-Encoding": "gzip"})
 
-class TestAuthContextModel:
-    """Tests for the AuthContext model."""
-
-    def test_auth_context_creation(self) -> None:
-        """AuthContext can be created with user_id."""
-        from planner_service.auth import AuthContext
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
 
-        auth = AuthContext(user_id="test-user")
-        assert auth.user_id == "test-user"
-        assert auth.token is None
 
-    def test_auth_context_with_token(self) -> None:
-        """AuthContext can be created with user_id and token."""
-        from planner_service.auth import AuthContext
+class TestAuthContextModel:
+    """Tests for the AuthContext model."""
 
-        auth = AuthContext(user_id="test-user", token="test-token")
-        assert auth.user_id == "test-user"
-        assert auth.token == "test-token"
+    @pytest.mark.parametrize(
+        ("user_id", "token"),
+        [
+            pytest.param("test-user", None, id="without-token"),
+            pytest.param("test-user", "test-token", id="with-token"),
+        ],
+    )
+    def test_auth_context_creation(self, user_id: str, token: str | None) -> None:
+        """AuthContext can be created with user_id and an optional token."""
+        auth = AuthContext(user_id=user_id, token=token)
+        assert auth.user_id == user_id
+        assert auth.token == token
 
 
 class TestGetCurrentUserDependency:
     """Tests for the get_current_user dependency."""
 
-    def test_returns_stub_user_without_header(self) -> None:
-        """get_current_user returns stub user when no header provided."""
-        from planner_service.auth import get_current_user
-
-        auth = get_current_user(authorization=None)
-        assert auth.user_id == "stub-user"
-        assert auth.token is None
-
-    def test_returns_stub_user_with_invalid_format(self) -> None:
-        """get_current_user returns stub user for invalid format."""
-        from planner_service.auth import get_current_user
-
-        auth = get_current_user(authorization="InvalidFormat")
-        assert auth.user_id == "stub-user"
-        assert auth.token is None
-
-    def test_returns_stub_user_with_valid_bearer_token(self) -> None:
-        """get_current_user returns stub user with token for valid bearer format."""
-        from planner_service.auth import get_current_user
-
-        auth = get_current_user(authorization="Bearer my-token")
+    @pytest.mark.parametrize(
+        ("header", "expected_token"),
+        [
+            pytest.param(None, None, id="missing-header"),
+            pytest.param("InvalidFormat", None, id="invalid-format"),
+            pytest.param("Bearer my-token", "my-token", id="bearer"),
+        ],
+    )
+    def test_get_current_user(
+        self, header: str | None, expected_token: str | None
+    ) -> None:
+        """get_current_user returns the stub user, with a token only for Bearer."""
+        auth = get_current_user(authorization=header)
         assert auth.user_id == "stub-user"
-        assert auth.token == "my-token"
+        assert auth.token == expected_token
 
 
 class TestPlanValidationLogging:
     """Tests for structured logging on plan validation failures."""
 
     def test_validation_failure_logs_structured_event(
-        self, client: TestClient
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Plan endpoint logs plan.validation.failed event on validation failure."""
-        from planner_service.plan_validator import PlanValidationFailure, StubPlanValidator
-
-        with (
-            patch.object(
-                StubPlanValidator,
-                "validate",
-                side_effect=PlanValidationFailure(
+        # Pin a stub instance so the class patch below is what gets called
+        monkeypatch.setattr(client.app.state, "plan_validator", StubPlanValidator())
+        monkeypatch.setattr(
+            StubPlanValidator,
+            "validate",
+            _raising(
+                PlanValidationFailure(
                     code="MISSING_REQUEST_ID",
                     message="Payload missing required key: request_id",
-                ),
+                )
             ),
-            patch("planner_service.api.get_logger") as mock_get_logger,
-        ):
-            mock_logger = mock_get_logger.return_value
+        )
+        with patch("planner_service.api.logger") as mock_logger:
             payload = {
                 "repository": {"owner": "test-owner", "name": "test-repo"},
-                "user_input": _make_user_input(),
+                "user_input": _USER_INPUT,
             }
             response = client.post("/v1/plan", json=payload)
 
@@ -18,17 +18,15 @@
 # ============================================================
 """Tests for plan validator abstraction and stub implementation (AF v1.1)."""
 
-import builtins
-from unittest.mock import MagicMock, patch
+import sys
+from collections.abc import Iterator
+from types import ModuleType
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
 
-from planner_service.models import (
-    PlanningContext,
-    ProjectContext,
-    UserInput,
-)
+from planner_service.models import PlanningContext
 from planner_service.plan_validator import (
     PlanValidationFailure,
     PlanValidator,
@@ -37,26 +35,17 @@ from planner_service.plan_validator import (
 )
 
 
-@pytest.fixture
-def sample_planning_context() -> PlanningContext:
-    """Create a sample planning context for tests (AF v1.1)."""
-    return PlanningContext(
-        request_id=uuid4(),
-        user_input=UserInput(
-            purpose="Create a new feature for user authentication",
-            vision="A fully functional auth system",
-            must=["Implement login", "Implement logout"],
-            dont=["Use deprecated APIs"],
-            nice=["Add remember me feature"],
-        ),
-        projects=[
-            ProjectContext(
-                repo_owner="test-owner",
-                repo_name="test-repo",
-                ref="refs/heads/main",
-            ),
-        ],
-    )
+class _FakePlanValidatorBackend:
+    """Plain stand-in for af_plan_validator.PlanValidatorBackend."""
+
+    def validate(self, ctx: PlanningContext, candidate_payload: object) -> dict:
+        """Return an empty payload; the factory tests never validate anything."""
+        return {}
+
+
+# Fake private backend module, injected through sys.modules by factory tests.
+_FAKE_AF_PLAN_VALIDATOR = ModuleType("af_plan_validator")
+_FAKE_AF_PLAN_VALIDATOR.PlanValidatorBackend = _FakePlanValidatorBackend
 
 
 @pytest.fixture
@@ -343,6 +332,17 @@ class TestPlanValidationFailureMetadata:
 class TestGetPlanValidatorFactory:
     """Tests for the get_plan_validator factory function."""
 
+    @pytest.fixture(autouse=True)
+    def _reset_factory_cache(self) -> Iterator[None]:
+        """Clear the memoized factory so each test resolves afresh."""
+        get_plan_validator.cache_clear()
+        yield
+        get_plan_validator.cache_clear()
+
+    def test_returns_same_instance_on_repeat_calls(self) -> None:
+        """Factory resolves the backend once and reuses the instance."""
+        assert get_plan_validator() is get_plan_validator()
+
     def test_returns_stub_validator_when_private_unavailable(self) -> None:
         """Factory returns StubPlanValidator when af_plan_validator is not available."""
         validator = get_plan_validator()
@@ -351,31 +351,14 @@ class TestGetPlanValidatorFactory:
 
     def test_uses_private_backend_when_available(self) -> None:
         """Factory uses private backend when successfully imported."""
-        mock_validator_instance = MagicMock()
-        mock_plan_validator_backend = MagicMock(return_value=mock_validator_instance)
-
-        # Create a mock module with the expected class
-        mock_module = MagicMock()
-        mock_module.PlanValidatorBackend = mock_plan_validator_backend
-
-        original_import = builtins.__import__
-
-        def mock_import(name, *args, **kwargs):
-            if name == "af_plan_validator":
-                return mock_module
-            return original_import(name, *args, **kwargs)
-
-        with patch.object(builtins, "__import__", side_effect=mock_import):
+        with patch.dict(sys.modules, {"af_plan_validator": _FAKE_AF_PLAN_VALIDATOR}):
             validator = get_plan_validator()
-            assert validator is mock_validator_instance
-            mock_plan_validator_backend.assert_called_once()
+
+        assert isinstance(validator, _FakePlanValidatorBackend)
 
     def test_logs_fallback_on_import_error(self) -> None:
         """Factory logs when falling back to stub validator."""
-        with patch("planner_service.plan_validator.get_logger") as mock_get_logger:
-            mock_logger = MagicMock()
-            mock_get_logger.return_value = mock_logger
-
+        with patch("planner_service.plan_validator.logger") as mock_logger:
             get_plan_validator()
 
             mock_logger.info.assert_called_with(
@@ -386,26 +369,10 @@ class TestGetPlanValidatorFactory:
 
     def test_logs_when_private_backend_selected(self) -> None:
         """Factory logs when private backend is successfully selected."""
-        mock_validator_instance = MagicMock()
-        mock_plan_validator_backend = MagicMock(return_value=mock_validator_instance)
-
-        mock_module = MagicMock()
-        mock_module.PlanValidatorBackend = mock_plan_validator_backend
-
-        original_import = builtins.__import__
-
-        def mock_import(name, *args, **kwargs):
-            if name == "af_plan_validator":
-                return mock_module
-            return original_import(name, *args, **kwargs)
-
         with (
-            patch.object(builtins, "__import__", side_effect=mock_import),
-            patch("planner_service.plan_validator.get_logger") as mock_get_logger,
+            patch.dict(sys.modules, {"af_plan_validator": _FAKE_AF_PLAN_VALIDATOR}),
+            patch("planner_service.plan_validator.logger") as mock_logger,
         ):
-            mock_logger = MagicMock()
-            mock_get_logger.return_value = mock_logger
-
             get_plan_validator()
 
             mock_logger.info.assert_called_with(
@@ -18,12 +18,15 @@
 # ============================================================
 """Tests for prompt engine abstraction and stub implementation (AF v1.1)."""
 
-import builtins
-from unittest.mock import MagicMock, patch
+import importlib.util
+import sys
+from collections.abc import Iterator
+from types import ModuleType
 from uuid import uuid4
 
 import pytest
 
+from planner_service import prompt_engine
 from planner_service.models import (
     PlanningContext,
     ProjectContext,
@@ -35,27 +38,38 @@ from planner_service.prompt_engine import (
     get_prompt_engine,
 )
 
+# Surface deprecations from pydantic or the engine as failures, not noise.
+pytestmark = pytest.mark.filterwarnings("error::DeprecationWarning")
+
+
+class _FakePromptEngineBackend:
+    """Plain stand-in for af_prompt_core.PromptEngineBackend."""
+
+    def run(self, ctx: PlanningContext) -> dict:
+        """Return an empty payload; the factory tests never run the engine."""
+        return {}
+
+
+# The fallback tests rely on the private backend being absent.
+_HAS_AF_PROMPT_CORE = importlib.util.find_spec("af_prompt_core") is not None
+
+# Fake private backend module, placed in sys.modules by factory tests.
+_FAKE_AF_PROMPT_CORE = ModuleType("af_prompt_core")
+_FAKE_AF_PROMPT_CORE.PromptEngineBackend = _FakePromptEngineBackend
 
-@pytest.fixture
-def sample_planning_context() -> PlanningContext:
-    """Create a sample planning context for tests (AF v1.1)."""
-    return PlanningContext(
-        request_id=uuid4(),
-        user_input=UserInput(
-            purpose="Create a new feature for user authentication",
-            vision="A fully functional auth system",
-            must=["Implement login", "Implement logout"],
-            dont=["Use deprecated APIs"],
-            nice=["Add remember me feature"],
-        ),
-        projects=[
-            ProjectContext(
-                repo_owner="test-owner",
-                repo_name="test-repo",
-                ref="refs/heads/main",
-            ),
-        ],
-    )
+
+class _LogRecorder:
+    """Minimal logger stand-in that records info calls as (event, kwargs)."""
+
+    __slots__ = ("calls",)
+
+    def __init__(self) -> None:
+        """Start with no recorded calls."""
+        self.calls: list[tuple[str, dict]] = []
+
+    def info(self, event: str, **kwargs: object) -> None:
+        """Record one info event."""
+        self.calls.append((event, kwargs))
 
 
 class TestPromptEngineProtocol:
@@ -71,81 +85,75 @@ class TestPromptEngineProtocol:
         assert hasattr(PromptEngine, "run")
 
 
+@pytest.fixture(scope="module")
+def engine() -> StubPromptEngine:
+    """One stateless engine shared by the StubPromptEngine tests."""
+    return StubPromptEngine()
+
+
 class TestStubPromptEngine:
     """Tests for the StubPromptEngine implementation (AF v1.1)."""
 
-    def test_run_returns_dict_with_required_keys(
-        self, sample_planning_context: PlanningContext
+    def test_run_output_shape(
+        self, engine: StubPromptEngine, sample_planning_context: PlanningContext
     ) -> None:
-        """run returns a dict with all required keys."""
-        engine = StubPromptEngine()
+        """run returns the required keys, success status, repository and preview."""
         result = engine.run(sample_planning_context)
 
-        assert "request_id" in result
-        assert "plan_version" in result
-        assert "repository" in result
-        assert "status" in result
-        assert "prompt_preview" in result
+        assert result.keys() >= {
+            "request_id",
+            "plan_version",
+            "repository",
+            "status",
+            "prompt_preview",
+        }
+        assert result["status"] == "success"
+        # Repository metadata comes from the first project (AF v1.1)
+        assert result["repository"] == {
+            "owner": "test-owner",
+            "name": "test-repo",
+            "ref": "refs/heads/main",
+        }
+        # Preview is a stub summary and does not expose real prompts
+        assert result["prompt_preview"] == (
+            "[STUB] Planning request for test-owner/test-repo: "
+            "Create a new feature for user authentication"
+        )
 
     def test_run_returns_plan_version(
-        self, sample_planning_context: PlanningContext
+        self, engine: StubPromptEngine, sample_planning_context: PlanningContext
     ) -> None:
         """run returns plan_version af/1.1-stub for the stub engine."""
-        engine = StubPromptEngine()
         result = engine.run(sample_planning_context)
 
         assert result["plan_version"] == "af/1.1-stub"
 
-    def test_run_returns_success_status(
-        self, sample_planning_context: PlanningContext
-    ) -> None:
-        """run returns success status for valid input."""
-        engine = StubPromptEngine()
-        result = engine.run(sample_planning_context)
-
-        assert result["status"] == "success"
-
-    def test_run_returns_repository_metadata(
-        self, sample_planning_context: PlanningContext
-    ) -> None:
-        """run includes repository metadata in output (AF v1.1)."""
-        engine = StubPromptEngine()
-        result = engine.run(sample_planning_context)
-
-        repo = result["repository"]
-        assert repo["owner"] == "test-owner"
-        assert repo["name"] == "test-repo"
-        assert repo["ref"] == "refs/heads/main"
-
     def test_run_returns_context_request_id(
-        self, sample_planning_context: PlanningContext
+        self, engine: StubPromptEngine, sample_planning_context: PlanningContext
     ) -> None:
         """run returns request_id from the PlanningContext."""
-        engine = StubPromptEngine()
         result = engine.run(sample_planning_context)
 
         # The returned request_id should match the context's request_id
         assert result["request_id"] == str(sample_planning_context.request_id)
 
-    def test_run_returns_prompt_preview(
-        self, sample_planning_context: PlanningContext
+    @pytest.mark.parametrize(
+        ("length", "expected_suffix"),
+        [
+            pytest.param(49, "A" * 49, id="below-limit"),
+            pytest.param(50, "A" * 50, id="at-limit"),
+            pytest.param(51, "A" * 50 + "...", id="just-over-limit"),
+            pytest.param(500, "A" * 50 + "...", id="far-over-limit"),
+        ],
+    )
+    def test_run_truncates_long_purpose_in_preview(
+        self, engine: StubPromptEngine, length: int, expected_suffix: str
     ) -> None:
-        """run returns a prompt preview without exposing real prompts."""
-        engine = StubPromptEngine()
-        result = engine.run(sample_planning_context)
-
-        preview = result["prompt_preview"]
-        assert "[STUB]" in preview
-        assert "test-owner/test-repo" in preview
-        assert "user authentication" in preview
-
-    def test_run_truncates_long_purpose_in_preview(self) -> None:
-        """run truncates long purpose in prompt preview."""
-        long_purpose = "A" * 100
+        """run truncates purposes longer than 50 characters in the preview."""
         ctx = PlanningContext(
             request_id=uuid4(),
             user_input=UserInput(
-                purpose=long_purpose,
+                purpose="A" * length,
                 vision="Test vision",
                 must=["Test"],
                 dont=["Test"],
@@ -160,115 +168,100 @@ class TestStubPromptEngine:
             ],
         )
 
-        engine = StubPromptEngine()
         result = engine.run(ctx)
 
-        preview = result["prompt_preview"]
-        assert "..." in preview
+        assert result["prompt_preview"] == (
+            f"[STUB] Planning request for owner/repo: {expected_suffix}"
+        )
 
     def test_run_deterministic_output_structure(
-        self, sample_planning_context: PlanningContext
+        self, engine: StubPromptEngine, sample_planning_context: PlanningContext
     ) -> None:
-        """run returns consistent output structure across calls."""
-        engine = StubPromptEngine()
-        result1 = engine.run(sample_planning_context)
-        result2 = engine.run(sample_planning_context)
-
-        # Same structure and values except request_id
-        assert result1["status"] == result2["status"]
-        assert result1["repository"] == result2["repository"]
-        # prompt_preview should be same for same input
-        assert result1["prompt_preview"] == result2["prompt_preview"]
+        """run returns identical output across calls for the same context."""
+        # request_id is echoed from the context, so every field must match
+        assert engine.run(sample_planning_context) == engine.run(
+            sample_planning_context
+        )
 
     def test_run_logs_request_metadata(
-        self, sample_planning_context: PlanningContext
+        self,
+        sample_planning_context: PlanningContext,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """run logs request metadata for debugging."""
-        with patch("planner_service.prompt_engine.get_logger") as mock_get_logger:
-            mock_logger = MagicMock()
-            mock_get_logger.return_value = mock_logger
-
-            engine = StubPromptEngine()
-            engine.run(sample_planning_context)
-
-            mock_logger.info.assert_called_once()
-            call_args = mock_logger.info.call_args
-            assert call_args[0][0] == "stub_prompt_engine_run"
-            assert call_args[1]["repository"] == "test-owner/test-repo"
+        recorder = _LogRecorder()
+        monkeypatch.setattr(prompt_engine, "logger", recorder)
+        StubPromptEngine().run(sample_planning_context)
+
+        assert recorder.calls == [
+            (
+                "stub_prompt_engine_run",
+                {
+                    "request_id": str(sample_planning_context.request_id),
+                    "repository": "test-owner/test-repo",
+                },
+            )
+        ]
 
 
 class TestGetPromptEngineFactory:
     """Tests for the get_prompt_engine factory function."""
 
+    @pytest.fixture(autouse=True)
+    def _reset_factory_cache(self) -> Iterator[None]:
+        """Clear the memoized factory so each test resolves afresh."""
+        get_prompt_engine.cache_clear()
+        yield
+        get_prompt_engine.cache_clear()
+
+    def test_returns_same_instance_on_repeat_calls(self) -> None:
+        """Factory resolves the backend once and reuses the instance."""
+        assert get_prompt_engine() is get_prompt_engine()
+
+    @pytest.mark.skipif(_HAS_AF_PROMPT_CORE, reason="af_prompt_core is installed")
     def test_returns_stub_engine_when_private_unavailable(self) -> None:
         """Factory returns StubPromptEngine when af_prompt_core is not available."""
         engine = get_prompt_engine()
 
         assert isinstance(engine, StubPromptEngine)
 
-    def test_uses_private_backend_when_available(self) -> None:
+    def test_uses_private_backend_when_available(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Factory uses private backend when successfully imported."""
-        mock_engine_instance = MagicMock()
-        mock_prompt_engine_backend = MagicMock(return_value=mock_engine_instance)
-
-        # Create a mock module with the expected class
-        mock_module = MagicMock()
-        mock_module.PromptEngineBackend = mock_prompt_engine_backend
-
-        original_import = builtins.__import__
-
-        def mock_import(name, *args, **kwargs):
-            if name == "af_prompt_core":
-                return mock_module
-            return original_import(name, *args, **kwargs)
+        monkeypatch.setitem(sys.modules, "af_prompt_core", _FAKE_AF_PROMPT_CORE)
+        engine = get_prompt_engine()
 
-        with patch.object(builtins, "__import__", side_effect=mock_import):
-            engine = get_prompt_engine()
-            assert engine is mock_engine_instance
-            mock_prompt_engine_backend.assert_called_once()
+        assert isinstance(engine, _FakePromptEngineBackend)
 
-    def test_logs_fallback_on_import_error(self) -> None:
+    @pytest.mark.skipif(_HAS_AF_PROMPT_CORE, reason="af_prompt_core is installed")
+    def test_logs_fallback_on_import_error(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Factory logs when falling back to stub engine."""
-        with patch("planner_service.prompt_engine.get_logger") as mock_get_logger:
-            mock_logger = MagicMock()
-            mock_get_logger.return_value = mock_logger
-
-            get_prompt_engine()
+        recorder = _LogRecorder()
+        monkeypatch.setattr(prompt_engine, "logger", recorder)
+        get_prompt_engine()
 
-            mock_logger.info.assert_called_with(
+        assert recorder.calls == [
+            (
                 "prompt_engine_fallback",
-                engine="stub",
-                reason="af_prompt_core not available",
+                {"engine": "stub", "reason": "af_prompt_core not available"},
             )
+        ]
 
-    def test_logs_when_private_backend_selected(self) -> None:
+    def test_logs_when_private_backend_selected(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Factory logs when private backend is successfully selected."""
-        mock_engine_instance = MagicMock()
-        mock_prompt_engine_backend = MagicMock(return_value=mock_engine_instance)
-
-        mock_module = MagicMock()
-        mock_module.PromptEngineBackend = mock_prompt_engine_backend
-
-        original_import = builtins.__import__
+        recorder = _LogRecorder()
+        monkeypatch.setitem(sys.modules, "af_prompt_core", _FAKE_AF_PROMPT_CORE)
+        monkeypatch.setattr(prompt_engine, "logger", recorder)
+        get_prompt_engine()
 
-        def mock_import(name, *args, **kwargs):
-            if name == "af_prompt_core":
-                return mock_module
-            return original_import(name, *args, **kwargs)
-
-        with (
-            patch.object(builtins, "__import__", side_effect=mock_import),
-            patch("planner_service.prompt_engine.get_logger") as mock_get_logger,
-        ):
-            mock_logger = MagicMock()
-            mock_get_logger.return_value = mock_logger
-
-            get_prompt_engine()
-
-            mock_logger.info.assert_called_with(
-                "prompt_engine_selected",
-                engine="af_prompt_core",
-            )
+        assert recorder.calls == [
+            ("prompt_engine_selected", {"engine": "af_prompt_core"})
+        ]
 
 
 class TestMultipleProjectContextHandling:
@@ -403,3 +396,42 @@ class TestStubPromptEngineMirroredData:
         assert result["context"][0]["repo_name"] == "frontend"
         assert result["context"][1]["repo_name"] == "backend"
         assert result["context"][1]["ref"] == "refs/heads/develop"
+
+    def test_context_mirror_is_fresh_per_run(self) -> None:
+        """Mutating one payload's context does not leak into the next run.
+
+        StubContextDriver memoizes contexts per repository, so the same
+        ProjectContext backs every request for that repository.
+        """
+        from planner_service.context_driver import StubContextDriver
+        from planner_service.models import RepositoryPointer
+
+        driver = StubContextDriver()
+        repo = RepositoryPointer(owner="org", name="repo")
+        user_input = UserInput(
+            purpose="Isolation check",
+            vision="Independent payloads",
+            must=[],
+            dont=[],
+            nice=[],
+        )
+        engine = StubPromptEngine()
+
+        first = engine.run(
+            PlanningContext(
+                request_id=uuid4(),
+                user_input=user_input,
+                projects=[driver.fetch_context(repo)],
+            )
+        )
+        first["context"][0]["tree_json"] = "MUTATED"
+
+        project = driver.fetch_context(repo)
+        second = engine.run(
+            PlanningContext(
+                request_id=uuid4(), user_input=user_input, projects=[project]
+            )
+        )
+
+        assert second["context"][0]["tree_json"] != "MUTATED"
+        assert second["context"][0] == project.model_dump()